@@ -0,0 +1,78 @@
+# autosave.py
+import sys, threading, time, traceback
+
+class AutoSaver:
+    """
+    Runs save jobs on a background thread so the game loop never waits for disk I/O.
+
+    A save source is a function called on the game thread that snapshots its state and
+    returns a job (a function that serializes and writes the snapshot), e.g.
+    Roster.save_job or save_load.save_game_job. Jobs run one at a time on the worker;
+    a newer request for a key replaces one that hasn't started yet.
+    """
+    def __init__(self, interval=None):
+        self.interval = interval  # seconds between autosaves, None to only save on request
+        self._sources = {}
+        self._pending = {}
+        self._busy = False
+        self._stop = False
+        self._last = time.monotonic()
+        self._cond = threading.Condition()
+        self.errors = []
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def add_source(self, key, make_job):
+        self._sources[key] = make_job
+
+    def request(self, key, job=None):
+        """Queues a save for key; job defaults to calling its source now."""
+        if job is None:
+            job = self._sources[key]()
+        with self._cond:
+            self._pending[key] = job
+            self._cond.notify_all()
+
+    def save_all(self):
+        for key in self._sources:
+            self.request(key)
+        self._last = time.monotonic()
+
+    def tick(self, now=None):
+        """Call once per frame; queues an autosave of every source when the interval is up."""
+        if self.interval is None:
+            return
+        now = time.monotonic() if now is None else now
+        if now - self._last >= self.interval:
+            self.save_all()
+
+    def flush(self, timeout=None):
+        """Blocks until every queued save is written. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stop)
+                if not self._pending:
+                    return
+                key = next(iter(self._pending))
+                job = self._pending.pop(key)
+                self._busy = True
+            try:
+                job()
+            except Exception as e:
+                self.errors.append((key, e))
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
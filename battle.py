@@ -1,8 +1,13 @@
 import random
+from time import perf_counter
+import instrument
+from battle_log import BattleLog, LOG_FULL, LOG_NONE
+from seeding import make_rng
 
-def simple_calc_damage(attacker, defender, mult=1.0):
+def calc_damage(attacker, defender, mult=1.0, roll=random.random):
     """
-    attacker, defender: dicts with keys 'attack', 'defense', 'crit_rate', 'crit_dmg', etc.
+    Same as simple_calc_damage but returns (dmg, crit_flag). Also accepts BattleUnits.
+    roll: function returning the crit roll in [0, 1), e.g. a seeded Random's .random
     """
     atk = attacker.get("attack", 100)
     defense = defender.get("defense", 50)
@@ -10,67 +15,159 @@ def simple_calc_damage(attacker, defender, mult=1.0):
     mitigation = defense / (defense + 1000)
     dmg = int(base * (1 - mitigation))
     # crit
-    if random.random() < attacker.get("crit_rate", 0.05):
+    crit = roll() < attacker.get("crit_rate", 0.05)
+    if crit:
         dmg = int(dmg * attacker.get("crit_dmg", 1.5))
-    return max(0, dmg)
+    return max(0, dmg), crit
+
+def unit_damage(attacker, defender, mult=1.0, roll=random.random):
+    """calc_damage for BattleUnits, using attribute reads instead of .get()"""
+    defense = defender.defense
+    mitigation = defense / (defense + 1000)
+    dmg = int(attacker.attack * mult * (1 - mitigation))
+    crit = roll() < attacker.crit_rate
+    if crit:
+        dmg = int(dmg * attacker.crit_dmg)
+    return max(0, dmg), crit
+
+def simple_calc_damage(attacker, defender, mult=1.0, roll=random.random):
+    """
+    attacker, defender: dicts with keys 'attack', 'defense', 'crit_rate', 'crit_dmg', etc.
+    """
+    return calc_damage(attacker, defender, mult, roll)[0]
 
-def battle(team_chars, enemy_chars, max_turns=60):
+@instrument.timed("battle.battle")
+def battle(team_chars, enemy_chars, max_turns=60, log_level=LOG_FULL, on_round=None, rng=None, skills=False):
     """
-    team_chars, enemy_chars: lists of dicts representing characters (deep copies recommended)
-    Returns dict with keys: player_win (bool), rounds (list of rounds each a list of strings)
+    team_chars, enemy_chars: lists of Characters or dicts; they are only read, never modified
+    log_level: "full" (every hit), "summary" (damage per unit) or "none" (skip logging)
+    on_round: optional on_round(turn, log) called after every round, e.g. to stream progress
+    rng: crit roll stream, a random.Random or a seed for one (see seeding.battle_streams);
+         None uses the global random module
+    skills: True to fight with the units' skills and passives (see skill_battle.py);
+            plain attacks only by default
+    Returns dict with keys: player_win (bool), title, turns, log (BattleLog or None).
+    Use battle_log.entry_rounds(result) for the text rounds. Many plain battles of one team
+    are faster batched through battle_np.battles_numpy.
     """
-    # initialize combatants from dicts
-    allies = [deepcopy_char_stats(c) for c in team_chars]
-    enemies = [deepcopy_char_stats(c) for c in enemy_chars]
+    if skills:
+        from skill_battle import skill_battle
+        return skill_battle(team_chars, enemy_chars, max_turns, log_level, on_round, rng)
+    # battle instances over the templates, no copies of their stats
+    allies = [BattleUnit(c) for c in team_chars]
+    enemies = [BattleUnit(c) for c in enemy_chars]
+    n_allies = len(allies)
+    roll = make_rng(rng).random
+    log = None
+    if log_level != LOG_NONE:
+        log = BattleLog([c.name for c in allies + enemies], max_turns, log_level)
+    damage = unit_damage
+    loop_start = None
+    if instrument.enabled:
+        damage = instrument.counted("battle.damage_calls", unit_damage)
+        loop_start = perf_counter()
 
-    rounds = []
+    result = None
     turn = 1
     while turn <= max_turns:
-        round_lines = []
         # Allies act
-        for a in allies:
-            if a["hp"] <= 0:
+        for i, a in enumerate(allies):
+            if a.hp <= 0:
                 continue
-            target = next((e for e in enemies if e["hp"] > 0), None)
-            if not target:
+            t = next((j for j, e in enumerate(enemies) if e.hp > 0), None)
+            if t is None:
                 break
-            dmg = simple_calc_damage(a, target, mult=1.0)
-            target["hp"] -= dmg
-            round_lines.append(f"{a['name']} hits {target['name']} for {dmg}.")
+            dmg, crit = damage(a, enemies[t], 1.0, roll)
+            enemies[t].hp -= dmg
+            if log:
+                log.hit(turn, i, n_allies + t, dmg, crit)
 
         # Enemies act
-        for e in enemies:
-            if e["hp"] <= 0:
+        for i, e in enumerate(enemies):
+            if e.hp <= 0:
                 continue
-            target = next((a for a in allies if a["hp"] > 0), None)
-            if not target:
+            t = next((j for j, a in enumerate(allies) if a.hp > 0), None)
+            if t is None:
                 break
-            dmg = simple_calc_damage(e, target, mult=1.0)
-            target["hp"] -= dmg
-            round_lines.append(f"{e['name']} hits {target['name']} for {dmg}.")
+            dmg, crit = damage(e, allies[t], 1.0, roll)
+            allies[t].hp -= dmg
+            if log:
+                log.hit(turn, n_allies + i, t, dmg, crit)
 
-        rounds.append(round_lines)
+        if on_round:
+            on_round(turn, log)
 
         # check end
-        if not any(a["hp"] > 0 for a in allies):
-            return {"player_win": False, "rounds": rounds, "title": f"Stage battle (turn {turn})"}
-        if not any(e["hp"] > 0 for e in enemies):
-            return {"player_win": True, "rounds": rounds, "title": f"Stage battle (turn {turn})"}
+        if not any(a.hp > 0 for a in allies):
+            result = battle_result(False, f"Stage battle (turn {turn})", turn, log)
+            break
+        if not any(e.hp > 0 for e in enemies):
+            result = battle_result(True, f"Stage battle (turn {turn})", turn, log)
+            break
 
         turn += 1
 
-    return {"player_win": False, "rounds": rounds, "title": "Timed out"}
+    if result is None:
+        result = battle_result(False, "Timed out", max_turns, log)
+    if loop_start is not None:
+        instrument.record("battle.round_loop", perf_counter() - loop_start)
+        instrument.count("battle.rounds", result["turns"])
+    return result
 
-def deepcopy_char_stats(ch):
-    """
-    Converts a Character instance or dict into a battle-ready dict
-    """
-    # Handle Character instances or already-dict
+def battle_result(player_win, title, turns, log):
+    if log:
+        log.turns = turns
+    return {"player_win": player_win, "title": title, "turns": turns, "log": log}
+
+def template_stats(ch):
+    """Stats dict of a Character instance or dict (not copied)."""
     stats = getattr(ch, "current_stats", None)
     if stats is None and isinstance(ch, dict):
         stats = ch.get("stats", ch)
     elif stats is None:
         stats = {}
+    return stats
+
+class BattleUnit:
+    """
+    Battle instance of a Character or dict. The template is referenced, never copied or
+    modified: its combat stats are read once into slots and the fight only writes the
+    mutable combat state (hp, energy, buffs).
+    """
+    __slots__ = ("template", "id", "name", "max_hp", "attack", "defense", "crit_rate", "crit_dmg",
+                 "speed", "hp", "energy", "buffs")
+
+    def __init__(self, ch):
+        stats = template_stats(ch)
+        self.template = ch
+        self.id = getattr(ch, "id", ch.get("id", "unit") if isinstance(ch, dict) else "unit")
+        self.name = getattr(ch, "name", ch.get("name", "unit") if isinstance(ch, dict) else "unit")
+        self.max_hp = int(stats.get("max_hp", stats.get("hp", 100)))
+        self.attack = int(stats.get("attack", 100))
+        self.defense = int(stats.get("defense", 50))
+        self.crit_rate = stats.get("crit_rate", 0.05)
+        self.crit_dmg = stats.get("crit_dmg", 1.5)
+        self.speed = stats.get("speed", 100)
+        # combat state
+        self.hp = int(stats.get("hp", stats.get("max_hp", 100)))
+        self.energy = stats.get("energy", 0)
+        self.buffs = None  # created on first buff
+
+    @property
+    def stats(self):
+        return template_stats(self.template)
+
+    def get(self, key, default=None):
+        # dict-style access so calc_damage works on units and dicts alike
+        return getattr(self, key, default)
+
+@instrument.timed("copy.deepcopy_char_stats")
+def deepcopy_char_stats(ch):
+    """
+    Converts a Character instance or dict into a battle-ready dict
+    """
+    # Handle Character instances or already-dict
+    stats = template_stats(ch)
 
     hp = int(stats.get("hp", stats.get("max_hp", 100)))
     max_hp = int(stats.get("max_hp", stats.get("hp", 100)))
@@ -0,0 +1,121 @@
+# battle_cache.py
+import hashlib, json, os, threading
+from collections import OrderedDict
+from battle import battle, BattleUnit
+from battle_log import BattleLog, LOG_FULL, LOG_NONE
+from save_load import atomic_write
+
+# BattleUnit fields that decide a fight; anything battle() reads from a unit belongs here
+FINGERPRINT_FIELDS = ("name", "max_hp", "hp", "attack", "defense", "crit_rate", "crit_dmg", "speed", "energy")
+# and what skill battles read on top of those (skills by name: a template's skills don't change)
+SKILL_FINGERPRINT_FIELDS = ("cls", "dodge", "accuracy", "armor_pierce")
+
+def unit_fingerprint(ch, skills=False):
+    u = BattleUnit(ch)
+    fp = tuple(getattr(u, k) for k in FINGERPRINT_FIELDS)
+    if skills:
+        from skill_battle import SkillUnit
+        u = SkillUnit(ch, 0)
+        fp += tuple(getattr(u, k) for k in SKILL_FINGERPRINT_FIELDS)
+        skill_list = ch.get("skills", ()) if isinstance(ch, dict) else ch.skills
+        fp += tuple(s.get("name") for s in skill_list)
+    return fp
+
+def battle_key(team, enemies, seed, max_turns=60, skills=False):
+    """Content hash of a seeded battle: same units, seed and settings give the same outcome."""
+    fingerprint = lambda ch: unit_fingerprint(ch, skills)
+    data = repr((tuple(map(fingerprint, team)), tuple(map(fingerprint, enemies)),
+                 seed, max_turns) + ((True,) if skills else ())).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class BattleCache:
+    """
+    Memoizes battle() for seeded fights, keyed by battle_key.
+
+    The memory tier keeps the last max_entries results (LRU). With disk_dir, results are
+    also stored one file per key (disk_dir/ab/abcd...), written atomically so several
+    processes can share the directory. A hit returns the stored result without fighting;
+    an entry without the requested log is fought again and replaced.
+    Calls without a plain seed (int, str or bytes) are passed straight to battle(): None
+    rolls differently every time and a random.Random's repr is just its address.
+    """
+    def __init__(self, max_entries=4096, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._mem = OrderedDict()  # key -> (player_win, title, turns, log or None)
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def battle(self, team, enemies, seed, max_turns=60, log_level=LOG_FULL, skills=False):
+        """battle(team, enemies, max_turns, log_level, rng=seed, skills=skills), memoized."""
+        if not isinstance(seed, (int, str, bytes)):
+            return battle(team, enemies, max_turns, log_level, rng=seed, skills=skills)
+        key = battle_key(team, enemies, seed, max_turns, skills)
+        entry = self._get(key, log_level)
+        if entry is None:
+            result = battle(team, enemies, max_turns, log_level, rng=seed, skills=skills)
+            entry = (result["player_win"], result["title"], result["turns"], result["log"])
+            self._put(key, entry)
+        player_win, title, turns, log = entry
+        # a fresh dict per call; the log is shared and must be treated as read-only
+        return {"player_win": player_win, "title": title, "turns": turns,
+                "log": log if log_level != LOG_NONE else None}
+
+    def _get(self, key, log_level):
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+        from_disk = False
+        if entry is None and self.disk_dir:
+            entry = self._read(key)
+            if entry is not None:
+                from_disk = True
+                self._remember(key, entry)
+        if entry is None or not _has_log(entry, log_level):
+            self.misses += 1
+            return None
+        if from_disk:
+            self.disk_hits += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def _put(self, key, entry):
+        if entry[3] is not None:
+            # a full log is preallocated for max_turns of hits; don't keep the padding around
+            entry[3].trim()
+        self._remember(key, entry)
+        if self.disk_dir:
+            self._write(key, entry)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._mem[key] = entry
+            self._mem.move_to_end(key)
+            if len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        header, _, log = data.partition(b"\n")
+        player_win, title, turns = json.loads(header)
+        return player_win, title, turns, BattleLog.loads(log) if log else None
+
+    def _write(self, key, entry):
+        player_win, title, turns, log = entry
+        os.makedirs(os.path.dirname(self._path(key)), exist_ok=True)
+        data = json.dumps([player_win, title, turns]).encode() + b"\n" + (log.dumps() if log else b"")
+        # a temp name per writer, other processes may be storing the same key
+        atomic_write(self._path(key), data, tmp=f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def _has_log(entry, log_level):
+    log = entry[3]
+    return log_level == LOG_NONE or (log is not None and log.level == log_level)
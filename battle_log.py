@@ -0,0 +1,166 @@
+# battle_log.py
+import json
+from array import array
+
+# log_level values accepted by battle.battle
+LOG_NONE = "none"        # no log at all, result only
+LOG_SUMMARY = "summary"  # damage dealt per unit
+LOG_FULL = "full"        # every hit
+
+EVENT_FIELDS = 5  # turn, actor_idx, target_idx, value, flags
+
+# event kinds (skill battles); flags = crit | kind << 1 | skill << 5, skill indexes skill_names
+HIT, MISS, HEAL, BUFF, DEBUFF, STUN, STUNNED, ENERGY, TAUNT = range(9)
+_KIND_SHIFT, _SKILL_SHIFT = 1, 5
+
+# line templates by kind: (without skill, with skill); a = actor, t = target, s = skill, v = value
+_LINES = {
+    HIT: ("{a} hits {t} for {v}.", "{a} uses {s} on {t} for {v}."),
+    MISS: ("{a} misses {t}.", "{a}'s {s} misses {t}."),
+    HEAL: ("{t} regenerates {v} HP.", "{a}'s {s} heals {t} for {v}."),
+    BUFF: ("{t} is buffed for {v} turns.", "{t} gains {s} for {v} turns."),
+    DEBUFF: ("{t} is debuffed for {v} turns.", "{t} suffers {s} for {v} turns."),
+    STUN: ("{t} is stunned for {v} turns.", "{a}'s {s} stuns {t} for {v} turns."),
+    STUNNED: ("{a} is stunned and skips the turn.", "{a} is stunned and skips the turn."),
+    ENERGY: ("{t} gains {v} energy.", "{a}'s {s} gives {t} {v} energy."),
+    TAUNT: ("{a} taunts for {v} turns.", "{a} uses {s} and taunts for {v} turns."),
+}
+
+class BattleLog:
+    """
+    Compact battle log: hits are stored as rows of ints in one preallocated array and only
+    turned into text when a screen asks for rounds().
+    names: unit names, allies first then enemies; actor/target indexes point into it.
+    Skill battles log other events too (see event()); their skill names go in skill_names.
+    """
+    __slots__ = ("names", "level", "turns", "events", "n_events", "dealt", "skill_names",
+                 "_skill_ids", "_rounds")
+
+    def __init__(self, names, max_turns, level=LOG_FULL):
+        self.names = names
+        self.level = level
+        self.turns = 0
+        # at most one hit per unit per turn
+        capacity = max_turns * len(names) if level == LOG_FULL else 0
+        self.events = array("q", bytes(8 * EVENT_FIELDS * capacity))
+        self.n_events = 0
+        self.dealt = [0] * len(names)
+        self.skill_names = [None]  # index 0: no skill (basic attack, regen...)
+        self._skill_ids = None
+        self._rounds = None
+
+    def hit(self, turn, actor, target, dmg, crit):
+        self.dealt[actor] += dmg
+        if self.level == LOG_FULL:
+            ev = self.events
+            i = self.n_events * EVENT_FIELDS
+            try:
+                ev[i] = turn; ev[i+1] = actor; ev[i+2] = target; ev[i+3] = dmg; ev[i+4] = crit
+            except OverflowError:
+                # damage past int64 (very high stages): keep the events as a list of Python ints
+                ev = self.events = list(ev)
+                ev[i] = turn; ev[i+1] = actor; ev[i+2] = target; ev[i+3] = dmg; ev[i+4] = crit
+            self.n_events += 1
+
+    def event(self, turn, actor, target, value, kind=HIT, skill=None, crit=False):
+        """
+        Any battle event: a hit (counted in dealt), miss, heal, buff... skill is the skill's
+        name or None. The array grows as needed, a skill can hit several targets per turn.
+        """
+        if kind == HIT:
+            self.dealt[actor] += value
+        if self.level != LOG_FULL:
+            return
+        skill_id = 0
+        if skill is not None:
+            if self._skill_ids is None:
+                self._skill_ids = {name: i for i, name in enumerate(self.skill_names)}
+            skill_id = self._skill_ids.get(skill)
+            if skill_id is None:
+                skill_id = self._skill_ids[skill] = len(self.skill_names)
+                self.skill_names.append(skill)
+        ev = self.events
+        i = self.n_events * EVENT_FIELDS
+        if i == len(ev):
+            ev.extend([0] * (EVENT_FIELDS * max(16, self.n_events)))
+        flags = crit | kind << _KIND_SHIFT | skill_id << _SKILL_SHIFT
+        try:
+            ev[i] = turn; ev[i+1] = actor; ev[i+2] = target; ev[i+3] = value; ev[i+4] = flags
+        except OverflowError:
+            ev = self.events = list(ev)
+            ev[i] = turn; ev[i+1] = actor; ev[i+2] = target; ev[i+3] = value; ev[i+4] = flags
+        self.n_events += 1
+
+    def trim(self):
+        """Drops the unused preallocated rows, for a finished log that is kept (e.g. cached)."""
+        del self.events[self.n_events * EVENT_FIELDS:]
+
+    def line(self, actor, target, value, flags):
+        """Text of one event."""
+        skill = self.skill_names[flags >> _SKILL_SHIFT]
+        template = _LINES[flags >> _KIND_SHIFT & 15][skill is not None]
+        if skill is not None and flags & 1:
+            template += " Critical!"
+        return template.format(a=self.names[actor], t=self.names[target], s=skill, v=value)
+
+    def iter_events(self):
+        """Yields (turn, actor_idx, target_idx, value, flags) tuples (flags is the crit flag for plain hits)."""
+        ev = self.events
+        for i in range(0, self.n_events * EVENT_FIELDS, EVENT_FIELDS):
+            yield tuple(ev[i:i + EVENT_FIELDS])
+
+    def round_lines(self, turn):
+        """Text of one round of a full log, read back from the newest hits (cheap for the latest round)."""
+        ev = self.events
+        i = self.n_events * EVENT_FIELDS
+        while i and ev[i - EVENT_FIELDS] > turn:
+            i -= EVENT_FIELDS
+        end = i
+        while i and ev[i - EVENT_FIELDS] == turn:
+            i -= EVENT_FIELDS
+        return [self.line(ev[j+1], ev[j+2], ev[j+3], ev[j+4]) for j in range(i, end, EVENT_FIELDS)]
+
+    def rounds(self):
+        """Text of the battle as a list of rounds, each a list of strings (rendered once)."""
+        if self._rounds is None:
+            if self.level == LOG_FULL:
+                self._rounds = [[] for _ in range(self.turns)]
+                for turn, actor, target, value, flags in self.iter_events():
+                    self._rounds[turn - 1].append(self.line(actor, target, value, flags))
+            else:
+                self._rounds = [[f"{name} dealt {d} damage." for name, d in zip(self.names, self.dealt)]]
+        return self._rounds
+
+    def dumps(self):
+        """Bytes of the log: a JSON header line, then the raw hit events."""
+        header = {"names": self.names, "level": self.level, "turns": self.turns,
+                  "n_events": self.n_events, "dealt": self.dealt}
+        if len(self.skill_names) > 1:
+            header["skill_names"] = self.skill_names
+        events = self.events[:self.n_events * EVENT_FIELDS]
+        if isinstance(events, list):
+            header["events"] = events  # too big for int64, see hit()
+            events = b""
+        return json.dumps(header).encode() + b"\n" + bytes(events)
+
+    @classmethod
+    def loads(cls, data):
+        header, _, events = data.partition(b"\n")
+        header = json.loads(header)
+        log = cls(header["names"], 0, header["level"])
+        log.turns = header["turns"]
+        log.n_events = header["n_events"]
+        log.dealt = header["dealt"]
+        log.skill_names = header.get("skill_names", log.skill_names)
+        if "events" in header:
+            log.events = header["events"]
+        else:
+            log.events.frombytes(events)
+        return log
+
+def entry_rounds(entry):
+    """Rounds of a battle history entry, rendering its BattleLog if it has one."""
+    if "rounds" in entry:
+        return entry["rounds"]
+    log = entry.get("log")
+    return log.rounds() if log is not None else []
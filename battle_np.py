@@ -0,0 +1,118 @@
+# battle_np.py
+"""
+Batched battles: battles_numpy fights one team against many enemy teams at once, with the
+rules of battle.battle. Each battle is a row of (n_battles, team size) arrays, so a round of
+every battle costs a few NumPy calls per attacker slot instead of a Python loop per battle.
+
+A single battle is a handful of 5-element arrays, where NumPy's per-call overhead loses to
+the plain loop of battle.battle: only batches come through here (e.g. sweep --engine numpy).
+"""
+import random
+import numpy as np
+from battle import BattleUnit, battle, battle_result
+from battle_log import LOG_NONE
+from seeding import derive_seed
+
+_rng = np.random.default_rng()
+
+STAT_COLS = ("hp", "attack", "defense", "crit_rate", "crit_dmg")
+MAX_EXACT = 2**53  # stats are float64: hp and damage past this would be rounded
+
+def np_rng(rng):
+    """NumPy Generator for battle()'s rng argument: None -> module generator, else seeded from rng."""
+    if rng is None:
+        return _rng
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if isinstance(rng, random.Random):
+        return np.random.default_rng(rng.getrandbits(64))
+    return np.random.default_rng(derive_seed(rng))
+
+def team_stats(teams):
+    """
+    Stats of a list of teams (Characters or dicts), ordered like STAT_COLS.
+    Returns float64 array of shape (len(teams), largest team, len(STAT_COLS)); shorter
+    teams are padded with dead (0 hp) units, which are never targeted and never act.
+    """
+    stats = np.zeros((len(teams), max(map(len, teams), default=0), len(STAT_COLS)))
+    for b, team in enumerate(teams):
+        for k, c in enumerate(team):
+            u = BattleUnit(c)
+            # past MAX_EXACT the value only has to fail exact_teams()
+            stats[b, k] = (min(u.hp, MAX_EXACT), min(u.attack, MAX_EXACT), u.defense, u.crit_rate, u.crit_dmg)
+    return stats
+
+def exact_teams(stats):
+    """Per team: True if its hp and crit damage are exact in float64."""
+    hit = stats[..., 1] * np.maximum(stats[..., 4], 1)
+    return ((stats[..., 0] < MAX_EXACT) & (hit < MAX_EXACT)).all(axis=1)
+
+def side_attacks(atk, crit_rate, crit_dmg, rolls, attacker_hp, hp, defense):
+    """
+    One side's attacks for a round across all battles (hp modified in place).
+    Attacker slots act in order; each hits the first alive defender of its own battle.
+    """
+    rows = np.arange(hp.shape[0])
+    crit = rolls < crit_rate
+    for k in range(atk.shape[1]):
+        alive_def = hp > 0
+        acting = (attacker_hp[:, k] > 0) & alive_def.any(axis=1)
+        if not acting.any():
+            continue
+        t = alive_def.argmax(axis=1)
+        d = defense[rows, t]
+        dmg = np.floor(atk[:, k] * (1 - d / (d + 1000)))
+        dmg = np.where(crit[:, k], np.floor(dmg * crit_dmg[:, k]), dmg)
+        dmg = np.maximum(dmg, 0).astype(np.int64)
+        hp[rows, t] -= np.where(acting, dmg, 0)
+
+def battles_numpy(team_chars, enemy_teams, max_turns=60, rng=None):
+    """
+    Fights team_chars against every team in enemy_teams, all at once, with the targeting,
+    mitigation and crit rules of battle.battle. The crit rolls come from one stream for the
+    whole batch (rng, see np_rng), so a battle doesn't replay battle()'s rolls for a seed.
+    Teams with stats past float64 precision are fought one by one with battle().
+    Returns a list of battle() result dicts (log None), in enemy_teams order.
+    """
+    gen = np_rng(rng)
+    results = [None] * len(enemy_teams)
+    if not enemy_teams:
+        return results
+    ally = team_stats([team_chars])
+    enemy = team_stats(enemy_teams)
+    exact = exact_teams(enemy) & exact_teams(ally)[0]
+    for b in np.flatnonzero(~exact):
+        results[b] = battle(team_chars, enemy_teams[b], max_turns, log_level=LOG_NONE,
+                            rng=int(gen.integers(2**63)))
+
+    idx = np.flatnonzero(exact)  # battle of each row still running
+    enemy = enemy[idx]
+    a_hp = np.repeat(ally[:, :, 0], idx.size, axis=0).astype(np.int64)
+    a_atk, a_def, a_cr, a_cd = (np.repeat(ally[:, :, i], idx.size, axis=0) for i in range(1, 5))
+    e_hp = enemy[:, :, 0].astype(np.int64)
+    e_atk, e_def, e_cr, e_cd = (enemy[:, :, i] for i in range(1, 5))
+    n_allies = a_hp.shape[1]
+
+    turn = 1
+    while turn <= max_turns and idx.size:
+        rolls = gen.random((idx.size, n_allies + e_hp.shape[1]))
+        side_attacks(a_atk, a_cr, a_cd, rolls[:, :n_allies], a_hp, e_hp, e_def)
+        side_attacks(e_atk, e_cr, e_cd, rolls[:, n_allies:], e_hp, a_hp, a_def)
+
+        # check end (player loss is checked first, as in battle())
+        lost = ~(a_hp > 0).any(axis=1)
+        won = ~lost & ~(e_hp > 0).any(axis=1)
+        done = lost | won
+        if done.any():
+            for b, win in zip(idx[done], won[done]):
+                results[b] = battle_result(bool(win), f"Stage battle (turn {turn})", turn, None)
+            # finished battles leave the arrays, so the rest of the batch gets cheaper
+            keep = ~done
+            idx = idx[keep]
+            a_hp, a_atk, a_def, a_cr, a_cd = a_hp[keep], a_atk[keep], a_def[keep], a_cr[keep], a_cd[keep]
+            e_hp, e_atk, e_def, e_cr, e_cd = e_hp[keep], e_atk[keep], e_def[keep], e_cr[keep], e_cd[keep]
+        turn += 1
+
+    for b in idx:
+        results[b] = battle_result(False, "Timed out", max_turns, None)
+    return results
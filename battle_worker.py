@@ -0,0 +1,68 @@
+# battle_worker.py
+import itertools, queue, sys, threading, traceback
+from battle import battle
+
+# event kinds returned by BattleWorker.poll()
+ROUND = "round"    # data: (turn, lines of that round)
+DONE = "done"      # data: battle() result dict
+FAILED = "failed"  # data: the exception
+
+class BattleWorker:
+    """
+    Resolves battles on a background thread so the game loop keeps handling input.
+
+    submit() queues a fight and returns its job id; battles run one at a time in
+    submission order. Progress comes back through a queue: the game loop calls poll()
+    once per frame and gets (kind, job, data) events, every round of a fight as it is
+    resolved, then its result.
+    """
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._thread = threading.Thread(target=self._run, name="battle", daemon=True)
+        self._thread.start()
+
+    def submit(self, team, enemies, **battle_kwargs):
+        """Queues battle(team, enemies, **battle_kwargs); the units must not change until it is done."""
+        job = next(self._ids)
+        self._jobs.put((job, team, enemies, battle_kwargs))
+        return job
+
+    def poll(self):
+        """Events posted since the last call, oldest first."""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def pending(self):
+        """Number of battles submitted but not finished yet."""
+        return self._jobs.unfinished_tasks
+
+    def close(self, timeout=None):
+        """Finishes the queued battles and stops the thread; poll() still returns their events."""
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                self._jobs.task_done()
+                return
+            job, team, enemies, kwargs = item
+            post = self._events.put
+
+            def on_round(turn, log):
+                post((ROUND, job, (turn, log.round_lines(turn) if log else [])))
+            try:
+                result = battle(team, enemies, on_round=on_round, **kwargs)
+                post((DONE, job, result))
+            except Exception as e:
+                traceback.print_exc(file=sys.stderr)
+                post((FAILED, job, e))
+            finally:
+                self._jobs.task_done()
@@ -0,0 +1,77 @@
+# benchmarks/bench_battle.py
+import pytest
+pytest.importorskip("pytest_benchmark")
+
+from battle import battle
+from battle_cache import BattleCache
+from campaign import generate_enemy_team, get_stage_rewards_range
+from conftest import SEED, peak_memory
+from seeding import battle_seeds
+
+STAGES = (1, 10, 100, 500, 1000)
+
+def campaign_run(team, enemy_templates, stages, log_level="none"):
+    """One seeded battle per stage, the way a campaign or sweep plays them."""
+    wins = 0
+    for stage in stages:
+        enemy_seed, crit_seed = battle_seeds(SEED, stage)
+        enemies = generate_enemy_team(stage, enemy_templates, characters=False, rng=enemy_seed)
+        wins += battle(team, enemies, log_level=log_level, rng=crit_seed)["player_win"]
+    return wins
+
+@pytest.mark.parametrize("stage", STAGES)
+@pytest.mark.parametrize("log_level", ("full", "none"))
+def bench_battle(benchmark, team, enemy_templates, stage, log_level):
+    enemies = generate_enemy_team(stage, enemy_templates, characters=False, rng=SEED)
+    benchmark(battle, team, enemies, log_level=log_level, rng=SEED)
+    peak_memory(benchmark, battle, team, enemies, 60, log_level)
+
+@pytest.mark.parametrize("stage", (10, 100))
+def bench_skill_battle(benchmark, team, enemy_templates, stage):
+    enemies = generate_enemy_team(stage, enemy_templates, characters=False, rng=SEED)
+    benchmark(battle, team, enemies, log_level="full", rng=SEED, skills=True)
+
+def bench_campaign_stages_1_to_1000(benchmark, team, enemy_templates):
+    stages = range(1, 1001)
+    benchmark.pedantic(campaign_run, (team, enemy_templates, stages), rounds=3, iterations=1)
+    peak_memory(benchmark, campaign_run, team, enemy_templates, stages)
+
+@pytest.mark.parametrize("stage", (10, 40))
+@pytest.mark.parametrize("engine", ("python", "numpy"))
+def bench_battle_batch(benchmark, team, enemy_templates, stage, engine):
+    """500 battles of one team at a stage, as a sweep task fights them: a loop or one batch."""
+    teams = [generate_enemy_team(stage, enemy_templates, characters=False, rng=battle_seeds(SEED, i)[0])
+             for i in range(500)]
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+        from battle_np import battles_numpy
+        run = lambda: battles_numpy(team, teams, rng=SEED)
+    else:
+        run = lambda: [battle(team, enemies, log_level="none", rng=i) for i, enemies in enumerate(teams)]
+    benchmark.pedantic(run, rounds=3, iterations=1)
+
+@pytest.mark.parametrize("characters", (True, False), ids=("characters", "units"))
+def bench_generate_enemy_team(benchmark, enemy_templates, characters):
+    stages = range(1, 1001)
+    def run():
+        for stage in stages:
+            generate_enemy_team(stage, enemy_templates, characters, rng=stage)
+    benchmark(run)
+    peak_memory(benchmark, run)
+
+def bench_simulate_many(benchmark, team, enemy_templates):
+    pytest.importorskip("numpy")
+    from simulate import simulate_many
+    # float64 stats stay exact up to about stage 600
+    stages = list(range(1, 601, 30))
+    benchmark.pedantic(simulate_many, (team, enemy_templates, stages, 500), {"rng": SEED}, rounds=3, iterations=1)
+    peak_memory(benchmark, simulate_many, team, enemy_templates, stages, 500, 60, SEED)
+
+def bench_battle_cache_hit(benchmark, team, enemy_templates):
+    enemies = generate_enemy_team(100, enemy_templates, characters=False, rng=SEED)
+    cache = BattleCache()
+    cache.battle(team, enemies, SEED)
+    benchmark(cache.battle, team, enemies, SEED)
+
+def bench_stage_rewards_range(benchmark):
+    benchmark(get_stage_rewards_range, 1, 1000)
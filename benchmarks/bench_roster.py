@@ -0,0 +1,76 @@
+# benchmarks/bench_roster.py
+import json, os
+import pytest
+pytest.importorskip("pytest_benchmark")
+
+from character import Character
+from conftest import make_roster, peak_memory
+from roster import Roster
+
+def load_and_read_all(filename):
+    roster = Roster()
+    roster.load_from_file(filename)
+    for h in roster.heroes:
+        h.current_stats
+    return roster
+
+def bench_recalc(benchmark, hero_templates):
+    chars = [Character(t["id"], t["rarity"], t["class"], t["stats"], t["skills"], level, stars, level % 7 == 0)
+             for t in hero_templates for level in range(1, 101) for stars in range(1, 7)]
+    def run():
+        for ch in chars:
+            ch.recalc()
+    benchmark(run)
+    peak_memory(benchmark, run)
+
+def bench_build_roster(benchmark, hero_templates):
+    benchmark.pedantic(make_roster, (1000, hero_templates), rounds=5, iterations=1)
+    peak_memory(benchmark, make_roster, 1000, hero_templates)
+
+def bench_save_roster(benchmark, roster, tmp_path):
+    filename = str(tmp_path / "roster.dat")
+    # a fresh copy each round so every save is a full write
+    benchmark.pedantic(lambda store: store.save(filename), setup=lambda: ((roster.heroes.copy(),), {}),
+                       rounds=3, iterations=1)
+
+def bench_save_roster_incremental(benchmark, roster, tmp_path):
+    filename = str(tmp_path / "roster.dat")
+    store = roster.heroes.copy()
+    store.save(filename)
+    def change_and_save():
+        for slot in range(0, len(store), max(1, len(store) // 10)):
+            store.set_progress(slot, level=store.level[slot] % 100 + 1)
+        store.save(filename)
+    benchmark(change_and_save)
+
+@pytest.fixture(scope="module")
+def saved_rosters(tmp_path_factory, roster):
+    """The roster saved as a RecordFile and as a legacy JSON list."""
+    path = tmp_path_factory.mktemp("rosters")
+    record_file = str(path / "roster.dat")
+    roster.heroes.copy().save(record_file)
+    json_file = str(path / "roster.json")
+    with open(json_file, "w") as f:
+        json.dump([h.to_dict() for h in roster.heroes], f)
+    return record_file, json_file
+
+@pytest.mark.parametrize("fmt", ("records", "json"))
+def bench_load_roster(benchmark, saved_rosters, fmt):
+    filename = saved_rosters[0] if fmt == "records" else saved_rosters[1]
+    benchmark.pedantic(load_and_read_all, (filename,), rounds=3, iterations=1)
+    benchmark.extra_info["file_kib"] = round(os.path.getsize(filename) / 1024, 1)
+    peak_memory(benchmark, load_and_read_all, filename)
+
+def bench_load_roster_lazy(benchmark, saved_rosters):
+    # only opens the file and reads the first team, as the game does at startup
+    def run():
+        roster = Roster()
+        roster.load_from_file(saved_rosters[0])
+        return [h.current_stats for h in roster.get_team(5)]
+    benchmark(run)
+
+def bench_best_teams(benchmark, hero_templates, enemy_templates):
+    from team_optimizer import best_teams
+    heroes = make_roster(500, hero_templates).heroes
+    benchmark.pedantic(best_teams, (heroes, enemy_templates, 100), {"top": 5, "budget": 5.0},
+                       rounds=3, iterations=1)
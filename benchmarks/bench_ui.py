@@ -0,0 +1,43 @@
+# benchmarks/bench_ui.py
+import pytest
+pytest.importorskip("pytest_benchmark")
+pygame = pytest.importorskip("pygame")
+
+from battle import battle
+from campaign import generate_enemy_team
+from conftest import SEED, peak_memory
+import ui
+
+@pytest.fixture(scope="module")
+def long_battle(team, enemy_templates):
+    # an evenly matched stage so the fight runs for many rounds
+    enemies = generate_enemy_team(42, enemy_templates, characters=False, rng=SEED)
+    return battle(team, enemies, max_turns=1000, rng=SEED)
+
+def bench_draw_battle_details(benchmark, screen, font, long_battle):
+    view = ui.details_list()
+    benchmark(ui.draw_battle_details, screen, font, long_battle, view)
+    benchmark.extra_info["rows"] = view.count
+
+def bench_draw_battle_details_first_frame(benchmark, screen, font, long_battle):
+    # new entry and an empty text cache every round: flattening the rounds plus rendering
+    def run():
+        ui.text_cache = ui.TextCache()
+        ui.draw_battle_details(screen, font, dict(long_battle), ui.details_list())
+    benchmark(run)
+    peak_memory(benchmark, run)
+
+def bench_draw_roster(benchmark, screen, font, roster):
+    view = ui.roster_list()
+    benchmark(ui.draw_roster, screen, font, roster, len(roster.heroes) // 2, view)
+
+def bench_canvas_frame(benchmark, screen, font, roster):
+    # record, diff and present one roster frame with the selection moving every frame
+    canvas = ui.Canvas(screen)
+    view = ui.roster_list()
+    state = {"selected": 0}
+    def frame():
+        state["selected"] = (state["selected"] + 1) % len(roster.heroes)
+        ui.draw_roster(canvas, font, roster, state["selected"], view)
+        canvas.present()
+    benchmark(frame)
@@ -0,0 +1,87 @@
+# benchmarks/conftest.py
+"""
+Benchmarks for the battle, roster and UI hot paths (needs pytest-benchmark).
+
+    SDL_VIDEODRIVER=dummy python -m pytest benchmarks
+    python -m pytest benchmarks --benchmark-compare     # diff against the last saved run
+
+Every run is saved under benchmarks/.benchmarks whichever directory pytest runs from
+(autosave in pytest.ini, the path in pytest_configure below; --benchmark-storage overrides
+it), so a regression shows up as a diff against the previous baseline. Fixtures are synthetic and seeded, so runs
+on the same box are comparable. Besides ops/sec each benchmark records the peak memory
+of one call (extra_info["peak_kib"], traced with tracemalloc).
+"""
+import os, random, sys, tracemalloc
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from roster import Roster
+from save_load import load_templates
+
+SEED = 1234
+ROSTER_SIZES = (10, 1000, 100000)
+DEFAULT_STORAGE = "file://./.benchmarks"  # pytest-benchmark's default, relative to the cwd
+
+def pytest_configure(config):
+    # runs before pytest-benchmark opens its storage
+    if config.getoption("benchmark_storage", None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = "file://" + os.path.join(HERE, ".benchmarks")
+
+def data_file(name):
+    return os.path.join(ROOT, "data", name)
+
+def peak_memory(benchmark, func, *args):
+    """Runs func once under tracemalloc and records its peak allocation in the benchmark."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        benchmark.extra_info["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+def make_roster(n, hero_templates, seed=SEED):
+    """n heroes cycling through the templates with seeded level/stars/awakened."""
+    rng = random.Random(seed)
+    roster = Roster()
+    store = roster.heroes
+    for i in range(n):
+        t = hero_templates[i % len(hero_templates)]
+        store.add(t["id"], t.get("name", t["id"]), t["rarity"], t["class"], t["stats"], t["skills"],
+                  rng.randint(1, 100), rng.randint(1, 6), rng.random() < 0.1)
+    store.dirty.clear()
+    return roster
+
+@pytest.fixture(scope="session")
+def hero_templates():
+    return load_templates(data_file("heroes.json"))
+
+@pytest.fixture(scope="session")
+def enemy_templates():
+    return load_templates(data_file("enemies.json"))
+
+@pytest.fixture(scope="session", params=ROSTER_SIZES, ids=lambda n: f"{n}heroes")
+def roster(request, hero_templates):
+    return make_roster(request.param, hero_templates)
+
+@pytest.fixture(scope="session")
+def team(hero_templates):
+    return make_roster(5, hero_templates).get_team(5)
+
+@pytest.fixture(scope="session")
+def screen():
+    pygame = pytest.importorskip("pygame")
+    pygame.init()
+    surface = pygame.display.set_mode((800, 600))
+    yield surface
+    pygame.quit()
+
+@pytest.fixture(scope="session")
+def font(screen):
+    import pygame
+    return pygame.font.SysFont("arial", 20)
@@ -1,38 +1,93 @@
-import random
-from character import Character
+import threading
+from collections import OrderedDict
+from character import Character, compute_stats, shared_skills
+from seeding import make_rng
+import instrument
 
-def generate_enemy_team(stage, enemy_data):
+ENEMY_CACHE_SIZE = 4096  # (template, stage) entries kept by enemy_stats
+
+# (id(template), stage) -> (template, base_stats, enemy unit dict), least recently used first
+_enemy_cache = OrderedDict()
+_enemy_lock = threading.Lock()
+
+@instrument.timed("campaign.generate_enemy_team")
+def generate_enemy_team(stage, enemy_data, characters=True, rng=None):
     """
     Returns a list of 5 Character objects scaled by stage.
     enemy_data: list of dicts (as loaded from JSON)
+    characters=False returns shared read-only unit dicts instead (see enemy_unit): enough
+    for battle() and much cheaper. Both draw the same enemies from the same random state.
+    rng: team generation stream, a random.Random or a seed for one; None uses the global random module
     """
+    choice = make_rng(rng).choice
+    if not characters:
+        return [enemy_unit(choice(enemy_data), stage) for _ in range(5)]
     team = []
     for _ in range(5):
-        template = random.choice(enemy_data)
-        scale = 1.05 ** stage
-        stats = {
-            "hp": int(template["stats"]["hp"] * scale),
-            "attack": int(template["stats"]["attack"] * scale),
-            "defense": int(template["stats"]["defense"] * scale),
-            "speed": template["stats"]["speed"],
-            "crit_rate": template["stats"].get("crit_rate", 0.05),
-            "crit_dmg": template["stats"].get("crit_dmg", 1.5),
-            "dodge": template["stats"].get("dodge", 0.02),
-            "accuracy": template["stats"].get("accuracy", 1.0),
-            "armor_pierce": template["stats"].get("armor_pierce", 0.0),
-            "energy": template["stats"].get("energy", 20)
-        }
-        # Always create Character instance
-        enemy = Character(
-            id_name=template.get("id", template["name"]),
-            rarity=template.get("rarity", "rare"),
-            cls=template.get("class", "Warrior"),
-            base_stats=stats,
-            skills=template.get("skills", []),
-        )
-        team.append(enemy)
+        template = choice(enemy_data)
+        team.append(make_enemy(template, stage))
     return team
 
+def make_enemy(template, stage):
+    """Builds one enemy Character from a template, scaled by stage."""
+    stats = enemy_stats(template, stage)
+    # Always create Character instance
+    enemy = Character(
+        id_name=template.get("id", template["name"]),
+        rarity=template.get("rarity", "rare"),
+        cls=template.get("class", "Warrior"),
+        base_stats=stats,
+        skills=template.get("skills", []),
+    )
+    return enemy
+
+def enemy_unit(template, stage):
+    """
+    Battle-ready enemy without a Character: {"id", "name", "class", "stats", "skills"} with
+    the stats and skills make_enemy(template, stage) would have. Cached and shared, don't modify it.
+    """
+    return _cached_enemy(template, stage)[2]
+
+def enemy_stats(template, stage):
+    """Base stats of a template scaled by stage (cached and shared, don't modify it)."""
+    return _cached_enemy(template, stage)[1]
+
+def _cached_enemy(template, stage):
+    key = (id(template), stage)
+    with _enemy_lock:
+        hit = _enemy_cache.get(key)
+        # the template is kept in the entry, so its id can't be reused while cached
+        if hit is not None and hit[0] is template:
+            _enemy_cache.move_to_end(key)
+            return hit
+    instrument.count("campaign.enemy_cache_misses")
+    scale = 1.05 ** stage
+    base = template["stats"]
+    stats = {
+        "hp": int(base["hp"] * scale),
+        "attack": int(base["attack"] * scale),
+        "defense": int(base["defense"] * scale),
+        "speed": base["speed"],
+        "crit_rate": base.get("crit_rate", 0.05),
+        "crit_dmg": base.get("crit_dmg", 1.5),
+        "dodge": base.get("dodge", 0.02),
+        "accuracy": base.get("accuracy", 1.0),
+        "armor_pierce": base.get("armor_pierce", 0.0),
+        "energy": base.get("energy", 20)
+    }
+    hero_id = template.get("id", template["name"])
+    rarity = template.get("rarity", "rare")
+    # enemies are level 1, 1 star, never awakened
+    unit = {"id": hero_id, "name": hero_id, "class": template.get("class", "Warrior"),
+            "stats": compute_stats(hero_id, rarity, 1, 1, False, stats),
+            "skills": shared_skills(hero_id, rarity, template.get("skills", []))}
+    entry = (template, stats, unit)
+    with _enemy_lock:
+        _enemy_cache[key] = entry
+        if len(_enemy_cache) > ENEMY_CACHE_SIZE:
+            _enemy_cache.popitem(last=False)
+    return entry
+
 
 def get_stage_rewards(stage):
     return {
@@ -42,3 +97,37 @@ def get_stage_rewards(stage):
         "XP": 50*stage,
         "Essence": 10*(stage//2)
     }
+
+def _rewards_upto(n):
+    """Rewards summed over stages 0..n (n >= -1); works elementwise on NumPy int arrays too."""
+    stage_sum = n * (n + 1) // 2
+    return {
+        "Coins": 100 * stage_sum,
+        "Gems": _floor_div_sum(n, 5),
+        "Gear": n // 3 + 1,          # multiples of 3 in 0..n, counting 0 (cancels out in ranges)
+        "XP": 50 * stage_sum,
+        "Essence": 10 * _floor_div_sum(n, 2)
+    }
+
+def _floor_div_sum(n, k):
+    # sum of s//k for s in 0..n: each full block of k stages adds one more than the last
+    q, r = n // k, n % k
+    return k * q * (q - 1) // 2 + q * (r + 1)
+
+def get_stage_rewards_range(start, end):
+    """Rewards of stages start..end (inclusive) summed, in O(1). Empty if end < start."""
+    if end < start:
+        return {item: 0 for item in ("Coins", "Gems", "Gear", "XP", "Essence")}
+    hi, lo = _rewards_upto(end), _rewards_upto(start - 1)
+    return {item: hi[item] - lo[item] for item in hi}
+
+def get_stage_rewards_ranges(starts, ends):
+    """
+    get_stage_rewards_range for arrays of (start, end) pairs at once.
+    Returns {item: int64 array}; needs NumPy. Stays exact for stages below ~10**8.
+    """
+    import numpy as np
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.maximum(np.asarray(ends, dtype=np.int64), starts - 1)  # empty ranges sum to 0
+    hi, lo = _rewards_upto(ends), _rewards_upto(starts - 1)
+    return {item: hi[item] - lo[item] for item in hi}
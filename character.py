@@ -1,5 +1,6 @@
 # character.py
 import math, random
+from skills import compile_skills
 
 # Rarity multipliers for base stats
 RARITY_MULT = {
@@ -21,7 +22,70 @@ ABILITY_COUNTS = {
     "Ascended": (4, 3)  # Wukong special handled separately
 }
 
+# Stats that grow linearly with level; everything else grows 3% per level
+LINEAR_STATS = ("crit_rate", "crit_dmg", "dodge", "accuracy")
+
+# (level, stars, rarity) -> (linear_mult, growth_mult), filled on first use
+_STAT_MULT = {}
+
+def stat_multipliers(level, stars, rarity):
+    """Combined level x stars x rarity multipliers: (linear stats, other stats)."""
+    key = (level, stars, rarity)
+    mult = _STAT_MULT.get(key)
+    if mult is None:
+        scale = (1 + 0.15 * (stars - 1)) * RARITY_MULT.get(rarity, 1.0)
+        mult = _STAT_MULT[key] = ((1 + 0.01*(level-1)) * scale, ((1.03)**(level-1)) * scale)
+    return mult
+
+def compute_stats(hero_id, rarity, level, stars, awakened, base_stats):
+    """Scale base stats by level, rarity, stars, and awakened bonus."""
+    linear_mult, growth_mult = stat_multipliers(level, stars, rarity)
+    stats = {k: v * (linear_mult if k in LINEAR_STATS else growth_mult)
+             for k, v in base_stats.items()}
+
+    stats["max_hp"] = stats.get("hp", 100)
+    stats["hp"] = stats["max_hp"]
+    stats["energy"] = stats.get("energy", 0)
+
+    # Awakening bonuses
+    if awakened:
+        boost_mult = 1.30
+        for stat in ("hp","attack","defense","speed"):
+            if stat in stats:
+                stats[stat] *= boost_mult
+
+        # Wukong special awakened effect
+        if hero_id == "wukong":
+            # Wukong gets a special OP passive each turn (handled in battle loop)
+            stats["wukong_special"] = True
+    return stats
+
+# (id, rarity, skill names) -> trimmed skills tuple shared by every hero of that template
+_SHARED_SKILLS = {}
+
+def shared_skills(hero_id, rarity, skills):
+    """Trim skills to match rarity (Wukong special case) and return the template's shared tuple."""
+    key = (hero_id, rarity, tuple(s.get("name") for s in skills))
+    shared = _SHARED_SKILLS.get(key)
+    if shared is None:
+        actives = [s for s in skills if s.get("type")=="active"]
+        passives = [s for s in skills if s.get("type")=="passive"]
+
+        if hero_id == "wukong":
+            want_a, want_p = 5, 4
+        else:
+            want_a, want_p = ABILITY_COUNTS.get(rarity, (1,0))
+
+        # Trim extras
+        shared = _SHARED_SKILLS[key] = tuple(actives[:want_a] + passives[:want_p])
+        # compiled once here, battles look it up by the tuple (see compiled_skills)
+        compile_skills(shared)
+    return shared
+
 class Character:
+    __slots__ = ("id", "name", "rarity", "cls", "_level", "_stars", "_awakened",
+                 "base_stats", "skills", "_current_stats")
+
     def __init__(self, id_name, rarity, cls, base_stats, skills,
                  level=1, stars=1, awakened=False, display_name=None):
         """
@@ -32,59 +96,66 @@ class Character:
         self.name = display_name if display_name else id_name
         self.rarity = rarity
         self.cls = cls
+        # current_stats is computed on first access and again only after
+        # level, stars or awakened change (call recalc() after editing base_stats)
+        self._current_stats = None
         self.level = level
         self.stars = stars
         self.awakened = awakened
         self.base_stats = base_stats.copy()
-        self.skills = skills[:]
+        self.skills = skills
         # enforce counts immediately
         self.enforce_ability_counts()
-        self.recalc()
 
-    def enforce_ability_counts(self):
-        """Trim or pad skills to match rarity. Wukong special case."""
-        actives = [s for s in self.skills if s.get("type")=="active"]
-        passives = [s for s in self.skills if s.get("type")=="passive"]
+    @property
+    def level(self):
+        return self._level
 
-        if self.id == "wukong":
-            want_a, want_p = 5, 4
-        else:
-            want_a, want_p = ABILITY_COUNTS.get(self.rarity, (1,0))
+    @level.setter
+    def level(self, value):
+        if value != getattr(self, "_level", None):
+            self._level = value
+            self._current_stats = None
 
-        # Trim extras
-        actives = actives[:want_a]
-        passives = passives[:want_p]
+    @property
+    def stars(self):
+        return self._stars
 
-        self.skills = actives + passives
+    @stars.setter
+    def stars(self, value):
+        if value != getattr(self, "_stars", None):
+            self._stars = value
+            self._current_stats = None
+
+    @property
+    def awakened(self):
+        return self._awakened
+
+    @awakened.setter
+    def awakened(self, value):
+        if value != getattr(self, "_awakened", None):
+            self._awakened = value
+            self._current_stats = None
+
+    @property
+    def current_stats(self):
+        if self._current_stats is None:
+            self.recalc()
+        return self._current_stats
+
+    @property
+    def compiled_skills(self):
+        """skills.SkillSet of this hero's skills, compiled once per template."""
+        return compile_skills(self.skills)
+
+    def enforce_ability_counts(self):
+        """Trim skills to match rarity. Heroes of the same template share one (immutable) tuple."""
+        self.skills = shared_skills(self.id, self.rarity, self.skills)
 
     def recalc(self):
         """Scale stats by level, rarity, stars, and awakened bonus."""
-        star_mult = 1 + 0.15 * (self.stars - 1)
-        rarity_mult = RARITY_MULT.get(self.rarity, 1.0)
-        lv = self.level
-        self.current_stats = {}
-
-        for k, v in self.base_stats.items():
-            if k in ("crit_rate","crit_dmg","dodge","accuracy"):
-                self.current_stats[k] = v * (1 + 0.01*(lv-1)) * star_mult * rarity_mult
-            else:
-                self.current_stats[k] = v * ((1.03)**(lv-1)) * star_mult * rarity_mult
-
-        self.current_stats["max_hp"] = self.current_stats.get("hp", 100)
-        self.current_stats["hp"] = self.current_stats["max_hp"]
-        self.current_stats["energy"] = self.current_stats.get("energy", 0)
-
-        # Awakening bonuses
-        if self.awakened:
-            boost_mult = 1.30
-            for stat in ("hp","attack","defense","speed"):
-                if stat in self.current_stats:
-                    self.current_stats[stat] *= boost_mult
-
-            # Wukong special awakened effect
-            if self.id == "wukong":
-                # Wukong gets a special OP passive each turn (handled in battle loop)
-                self.current_stats["wukong_special"] = True
+        self._current_stats = compute_stats(self.id, self.rarity, self.level, self.stars,
+                                            self.awakened, self.base_stats)
 
     def to_dict(self):
         return {
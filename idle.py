@@ -0,0 +1,143 @@
+# idle.py
+import math
+from battle import battle, BattleUnit
+from campaign import enemy_unit, generate_enemy_team, get_stage_rewards_range
+from seeding import make_rng, battle_streams, derive_seed
+
+SECONDS_PER_BATTLE = 30          # one campaign attempt per this many seconds away
+MAX_OFFLINE_SECONDS = 24 * 3600  # offline progress stops accumulating after this
+DECISIVE_MARGIN = 0.25           # expected-value fights won/lost by more than this aren't simulated
+BOUNDARY_SAMPLES = 32            # battles simulated to estimate the win chance of a close stage
+DECISIVE_SAMPLES = 8             # skill battles that must all be won for a clear win (see clear_frontier)
+
+def expected_hit(attacker, defender):
+    """Mean damage of one hit: the battle.unit_damage formula with the crit roll averaged out."""
+    dmg = int(attacker.attack * (1 - defender.defense / (defender.defense + 1000)))
+    return max(0, dmg * (1 - attacker.crit_rate) + int(dmg * attacker.crit_dmg) * attacker.crit_rate)
+
+def expected_battle(allies, enemies, max_turns=60):
+    """
+    battle.battle played with expected damage instead of crit rolls (same targeting and
+    end checks), plain rules only: skills and passives aren't modeled.
+    Returns (player_win, turns, margin): margin is the share of HP the winning side has
+    left, 0 for a timeout.
+    """
+    a_hp = [u.hp for u in allies]
+    e_hp = [u.hp for u in enemies]
+    a_hits = [[expected_hit(a, e) for e in enemies] for a in allies]
+    e_hits = [[expected_hit(e, a) for a in allies] for e in enemies]
+    for turn in range(1, max_turns + 1):
+        for hits, hp, target_hp in ((a_hits, a_hp, e_hp), (e_hits, e_hp, a_hp)):
+            for i, row in enumerate(hits):
+                if hp[i] <= 0:
+                    continue
+                t = next((j for j, h in enumerate(target_hp) if h > 0), None)
+                if t is None:
+                    break
+                target_hp[t] -= row[t]
+        if not any(h > 0 for h in a_hp):
+            return False, turn, sum(max(h, 0) for h in e_hp) / sum(u.max_hp for u in enemies)
+        if not any(h > 0 for h in e_hp):
+            return True, turn, sum(max(h, 0) for h in a_hp) / sum(u.max_hp for u in allies)
+    return False, max_turns, 0.0
+
+def stage_outcome(allies, enemy_templates, stage, max_turns=60):
+    """
+    True/False when the team clearly wins/loses a stage whatever enemies are drawn, else None.
+    Enemy teams are random picks of the templates, so the extremes are checked: a team of 5
+    of each template (expected_battle only reads units, so one unit fills all 5 places).
+    """
+    results = [expected_battle(allies, [BattleUnit(enemy_unit(t, stage))] * 5, max_turns)
+               for t in enemy_templates]
+    if all(win and margin > DECISIVE_MARGIN for win, _, margin in results):
+        return True
+    if all(not win and margin > DECISIVE_MARGIN for win, _, margin in results):
+        return False
+    return None
+
+def win_chance(team, enemy_templates, stage, max_turns=60, samples=BOUNDARY_SAMPLES, seed=None, skills=True):
+    """
+    Win rate over sampled battles with random enemy teams, as fought in the campaign.
+    seed: base seed for per-battle streams (seeding.battle_streams); None uses the global random module
+    skills: fight skill battles like the game does (see battle.battle); False for plain attacks
+    """
+    wins = 0
+    for i in range(samples):
+        enemy_rng, crit_rng = battle_streams(seed, i) if seed is not None else (None, None)
+        enemies = generate_enemy_team(stage, enemy_templates, characters=False, rng=enemy_rng)
+        result = battle(team, enemies, max_turns, log_level="none", rng=crit_rng, skills=skills)
+        wins += result["player_win"]
+    return wins / samples
+
+def clear_frontier(team, enemy_templates, stage, limit, max_turns=60, seed=None):
+    """
+    Last stage of stage..limit that is a clear win in skill battles (all DECISIVE_SAMPLES
+    sampled battles won), stage - 1 if stage isn't. Skill battles have no closed form like
+    stage_outcome's, but enemies only get stronger with the stage, so every stage before a
+    clear one is clear too: the search gallops forward, then bisects, sampling O(log) stages.
+    seed: base seed of the sampled battles (see win_chance), None for the global random module
+    """
+    def clear(s):
+        stage_seed = derive_seed(seed, s) if seed is not None else None
+        return win_chance(team, enemy_templates, s, max_turns, DECISIVE_SAMPLES, stage_seed, skills=True) == 1
+    lo, hi, step = stage - 1, None, 1  # lo: last stage known clear, hi: first known not clear
+    while lo < limit:
+        s = min(lo + step, limit)
+        if not clear(s):
+            hi = s
+            break
+        lo, step = s, step * 2
+    if hi is None:
+        return lo
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if clear(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+def fast_forward(team, enemy_templates, stage, elapsed, seconds_per_battle=SECONDS_PER_BATTLE,
+                 max_turns=60, rng=None, skills=True):
+    """
+    Campaign progress for `elapsed` seconds away: one attempt at the current stage every
+    seconds_per_battle, moving on after a win. Clear wins are decided cheaply and only
+    stages close to the win/loss boundary are simulated in full; the attempts a close stage
+    takes are drawn from its sampled win chance.
+    skills: fight skill battles as the game does; clear wins are found by clear_frontier.
+    With skills=False (plain rules) clear wins and losses are decided by expected_battle.
+    Returns dict with keys: start_stage, stage (next stage to fight), cleared, attempts,
+    simulated (stages that needed battles), rewards (summed over the cleared stages).
+    rng: a random.Random or seed for reproducible results; None uses the global random module
+    """
+    rng = make_rng(rng)
+    attempts = int(min(elapsed, MAX_OFFLINE_SECONDS) // seconds_per_battle)
+    allies = [BattleUnit(c) for c in team]
+    start, used, simulated = stage, 0, 0
+    if skills:
+        # clear wins up to here; past the first stage that isn't one, every stage is sampled
+        clear_until = clear_frontier(team, enemy_templates, stage, stage + attempts - 1, max_turns,
+                                     rng.getrandbits(64))
+    while used < attempts:
+        if skills:
+            outcome = stage <= clear_until or None
+        else:
+            outcome = stage_outcome(allies, enemy_templates, stage, max_turns)
+        if outcome is False:
+            break  # the team can't clear this stage; remaining attempts would all be lost
+        if outcome:
+            needed = 1
+        else:
+            simulated += 1
+            p = win_chance(team, enemy_templates, stage, max_turns, seed=rng.getrandbits(64), skills=skills)
+            if p == 0:
+                break
+            # attempts until the first win, geometric in p
+            needed = 1 if p == 1 else 1 + int(math.log(1 - rng.random()) / math.log(1 - p))
+        if used + needed > attempts:
+            break
+        used += needed
+        stage += 1
+    rewards = get_stage_rewards_range(start, stage - 1)
+    return {"start_stage": start, "stage": stage, "cleared": stage - start, "attempts": used,
+            "simulated": simulated, "rewards": rewards}
@@ -0,0 +1,52 @@
+# initiative.py
+import heapq
+
+GAUGE = 1000.0  # a unit acts each time its gauge fills, at `speed` per time unit
+MIN_SPEED = 1.0
+
+class Initiative:
+    """
+    ATB turn order over a heap of (next action time, unit index, version): faster units
+    act more often. pop() is O(log n) per action and a speed change only reschedules that
+    unit (the old heap entry is left behind and skipped by its version).
+    units: objects with .speed; ties go to the lower index (allies first).
+    A round lasts round_time: a unit as fast as the average of units acts once per round.
+    """
+    def __init__(self, units):
+        self.units = units
+        self.now = 0.0
+        # hero speed grows with level, so rounds follow the units in this fight
+        self.round_time = GAUGE * len(units) / max(MIN_SPEED, sum(u.speed for u in units)) if units else GAUGE
+        self._speed = [max(MIN_SPEED, u.speed) for u in units]
+        self._next = [GAUGE / s for s in self._speed]
+        self._version = [0] * len(units)
+        self._heap = [(t, i, 0) for i, t in enumerate(self._next)]
+        heapq.heapify(self._heap)
+
+    def pop(self):
+        """(unit, time) of the next action; the unit is queued again for its following one."""
+        heap = self._heap
+        while heap:
+            t, i, version = heapq.heappop(heap)
+            if version != self._version[i]:
+                continue
+            self.now = t
+            self._next[i] = t + GAUGE / self._speed[i]
+            heapq.heappush(heap, (self._next[i], i, version))
+            return self.units[i], t
+        return None, self.now
+
+    def reschedule(self, i):
+        """Call after units[i].speed changed: the rest of its current wait is rescaled."""
+        speed = max(MIN_SPEED, self.units[i].speed)
+        old = self._speed[i]
+        if speed == old or self._version[i] < 0:
+            return
+        self._speed[i] = speed
+        self._next[i] = self.now + (self._next[i] - self.now) * old / speed
+        self._version[i] += 1
+        heapq.heappush(self._heap, (self._next[i], i, self._version[i]))
+
+    def remove(self, i):
+        """Drops units[i] from the order (it died)."""
+        self._version[i] = -1
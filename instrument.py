@@ -0,0 +1,141 @@
+# instrument.py
+"""
+Opt-in timings and counters for the hot paths.
+
+Off by default: instrumented functions then pay one flag check per call. Turn it on with
+enable() or WUKONG_PROFILE=<file.json> (main dumps the stats there on exit, F3 shows them
+in game). Timings go into log2 histograms in memory:
+
+    with instrument.timer("draw.roster"): ...
+    @instrument.timed("campaign.generate_enemy_team")
+    instrument.count("battle.rounds", turns)
+"""
+import functools, json, os, threading
+from time import perf_counter
+
+enabled = False
+BUCKETS = 40  # bucket b holds durations below 2**b microseconds
+
+_hists = {}
+_counters = {}
+_lock = threading.Lock()
+
+class Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[min(BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def percentile(self, p):
+        """Upper bound (seconds) of the bucket holding the p-th percentile."""
+        rank = p / 100 * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(self.max, 2 ** b / 1e6)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "total_ms": self.total * 1e3,
+                "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+                "min_us": self.min * 1e6 if self.count else 0.0, "max_us": self.max * 1e6,
+                "p50_us": self.percentile(50) * 1e6, "p95_us": self.percentile(95) * 1e6}
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+def reset():
+    with _lock:
+        _hists.clear()
+        _counters.clear()
+
+def record(name, seconds):
+    with _lock:
+        hist = _hists.get(name)
+        if hist is None:
+            hist = _hists[name] = Histogram()
+        hist.add(seconds)
+
+def count(name, n=1):
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        record(self.name, perf_counter() - self.start)
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name):
+    """Context manager timing its block into histogram `name` (a shared no-op when disabled)."""
+    return _Timer(name) if enabled else _NULL_TIMER
+
+def timed(name):
+    """Decorator timing every call of the function into histogram `name`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        return wrapper
+    return decorate
+
+def counted(name, func):
+    """func wrapped to count its calls under `name`; callers only wrap it while enabled."""
+    def wrapper(*args):
+        count(name)
+        return func(*args)
+    return wrapper
+
+def stats():
+    """{"timings": {name: summary}, "counters": {name: n}}"""
+    with _lock:
+        return {"timings": {name: h.summary() for name, h in sorted(_hists.items())},
+                "counters": dict(sorted(_counters.items()))}
+
+def dump_json(filename):
+    with open(filename, "w") as f:
+        json.dump(stats(), f, indent=2)
+
+def from_env(var="WUKONG_PROFILE"):
+    """Enables instrumentation if the env var names an output file; returns that file or None."""
+    filename = os.environ.get(var)
+    if filename:
+        enable()
+    return filename
@@ -1002,75 +1002,149 @@ sys.exit()
 
 '''
 # main.py
-from pygame import Rect
-import pygame, sys, json
+import argparse, os, sys, json, time
 from roster import Roster
 from battle import battle
+from battle_worker import BattleWorker, ROUND, DONE
+from battle_log import entry_rounds
 from campaign import generate_enemy_team, get_stage_rewards
-from ui import draw_menu, draw_roster, draw_battle_history, draw_battle_details, draw_inventory
-from copy import deepcopy
+from save_load import load_templates, load_game, save_game_job
+from autosave import AutoSaver
+from idle import fast_forward, SECONDS_PER_BATTLE
+import instrument
 
 WIDTH, HEIGHT = 800, 600
 MAX_BATTLE_HISTORY = 10
+ROSTER_SAVE = "roster_save.dat"
+LEGACY_ROSTER_SAVE = "roster_save.json"  # JSON save of older versions, read until ROSTER_SAVE exists
+AUTOSAVE_SECONDS = 60
+
+def load_session():
+    """
+    Templates, roster and saved progress, with the campaign progress made while the game
+    was closed already applied. Returns a dict: hero_templates, enemy_templates, roster,
+    stage, inventory, offline (idle.fast_forward result or None) and away (seconds).
+    """
+    hero_templates = load_templates("data/heroes.json")
+    enemy_templates = load_templates("data/enemies.json")
 
-def load_templates(filename):
-    """Load JSON templates as a list of dicts."""
-    with open(filename, "r") as f:
-        data = json.load(f)
-        # Convert dict to list if needed
-        if isinstance(data, dict):
-            return list(data.values())
-        return data
-
-def draw_back_button(screen, button_font):
-    button_rect = Rect(650, 500, 120, 50)
-    pygame.draw.rect(screen, (100, 100, 100), button_rect)
-    pygame.draw.rect(screen, (255, 255, 255), button_rect, 2)
-    screen.blit(button_font.render("Back", True, (255, 255, 255)), (button_rect.x + 30, button_rect.y + 15))
-    return button_rect
-
-def draw_reward_preview(screen, font, stage, rewards):
-    screen.fill((30, 30, 60))
-    screen.blit(font.render(f"Stage {stage} Rewards", True, (255, 255, 0)), (50, 50))
-    y = 120
-    for item, amount in rewards.items():
-        screen.blit(font.render(f"{item}: {amount}", True, (255, 255, 255)), (50, y))
-        y += 30
-
-    fight_btn = Rect(200, 400, 150, 50)
-    back_btn = Rect(400, 400, 150, 50)
-    pygame.draw.rect(screen, (0, 200, 0), fight_btn)
-    pygame.draw.rect(screen, (200, 0, 0), back_btn)
-    screen.blit(font.render("Fight", True, (0, 0, 0)), (fight_btn.x+40, fight_btn.y+15))
-    screen.blit(font.render("Back", True, (0, 0, 0)), (back_btn.x+40, back_btn.y+15))
-    return fight_btn, back_btn
+    roster = Roster()
+    # the next save writes ROSTER_SAVE, so a legacy save is only read once
+    roster.load_from_file(ROSTER_SAVE if os.path.exists(ROSTER_SAVE) else LEGACY_ROSTER_SAVE)
+    roster.load_templates_into_roster(hero_templates)
+    if not roster.heroes:
+        for h in hero_templates:
+            roster.add_from_template(h)
+
+    inventory = {"Coins":0,"Gems":0,"Gear":0,"XP":0,"Essence":0}
+    saved = load_game()
+    stage = saved.get("stage", 1)
+    for item, amount in saved.get("inventory", {}).items():
+        if item in inventory:
+            inventory[item] = amount
+
+    # campaign progress made while the game was closed
+    offline = None
+    away = time.time() - saved.get("saved_at", time.time())
+    if away >= SECONDS_PER_BATTLE:
+        offline = fast_forward(roster.get_team(5), enemy_templates, stage, away)
+        if offline["cleared"]:
+            stage = offline["stage"]
+            for item, amount in offline["rewards"].items():
+                inventory[item] = inventory.get(item, 0) + amount
+    return {"hero_templates": hero_templates, "enemy_templates": enemy_templates, "roster": roster,
+            "stage": stage, "inventory": inventory, "offline": offline, "away": away}
+
+def headless(battles=0):
+    """
+    The game without a window, for backend workers and scripts: applies offline progress,
+    fights `battles` campaign battles the way the Fight button does, saves and prints a
+    JSON summary. Never imports pygame.
+    """
+    profile_file = instrument.from_env()
+    session = load_session()
+    roster, enemy_templates = session["roster"], session["enemy_templates"]
+    stage, inventory = session["stage"], session["inventory"]
+    offline = session["offline"]
+    start_stage, wins = stage, 0
+    for _ in range(battles):
+        result = battle(roster.get_team(5), generate_enemy_team(stage, enemy_templates, characters=False),
+                        log_level="none", skills=True)
+        if result["player_win"]:
+            wins += 1
+            for item, amount in get_stage_rewards(stage).items():
+                inventory[item] = inventory.get(item, 0) + amount
+        stage += 1
+
+    roster.save_job(ROSTER_SAVE)()
+    save_game_job({"stage": stage, "inventory": inventory, "saved_at": time.time()})()
+    print(json.dumps({"start_stage": start_stage, "stage": stage, "battles": battles, "wins": wins,
+                      "offline_cleared": offline["cleared"] if offline else 0, "inventory": inventory}))
+    if profile_file:
+        instrument.dump_json(profile_file)
 
 def main():
+    # the window and UI are only loaded here, headless() runs without them
+    import pygame
+    from pygame import Rect
+    from ui import (Canvas, roster_list, details_list, draw_text, draw_menu, draw_roster, draw_battle_history,
+                    draw_battle_details, draw_inventory, draw_stats_overlay, draw_back_button, draw_reward_preview)
+    # WUKONG_PROFILE=profile.json turns on instrumentation and dumps it there on exit
+    profile_file = instrument.from_env()
+    show_stats = False
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Sun Wukong Idle - Prototype")
+    # draw calls are recorded and only changed rectangles reach the display
+    canvas = Canvas(screen)
     font = pygame.font.SysFont("arial", 20)
     button_font = pygame.font.SysFont("arial", 18)
     clock = pygame.time.Clock()
 
-    hero_templates = load_templates("data/heroes.json")
-    enemy_templates = load_templates("data/enemies.json")
-
-    roster = Roster()
-    roster.load_templates_into_roster(hero_templates)
-    if not roster.heroes:
-        for h in hero_templates:
-            roster.add_from_template(h)
+    session = load_session()
+    enemy_templates, roster = session["enemy_templates"], session["roster"]
+    stage, inventory = session["stage"], session["inventory"]
 
     # Game state
     current_screen = "menu"
     selected = 0
-    stage = 1
     battle_history = []
     last_battle_log = None
     detail_index = 0
     rewards = None
-    inventory = {"Coins":0,"Gems":0,"Gear":0,"XP":0,"Essence":0}
+
+    offline, away = session["offline"], session["away"]
+    if offline and offline["cleared"]:
+        last_battle_log = {"title": f"Offline: stages {offline['start_stage']}-{stage-1}", "player_win": True,
+                           "rounds": [[f"Away {int(away//3600)}h {int(away%3600//60)}m: cleared {offline['cleared']} stages.",
+                                       ", ".join(f"{item} +{amount}" for item, amount in offline["rewards"].items())]]}
+        battle_history.append(last_battle_log)
+
+    # saves are snapshotted here and written on the autosave thread
+    autosaver = AutoSaver(interval=AUTOSAVE_SECONDS)
+    autosaver.add_source("roster", lambda: roster.save_job(ROSTER_SAVE))
+    autosaver.add_source("game", lambda: save_game_job({"stage": stage, "inventory": inventory, "saved_at": time.time()}))
+
+    # battles run on a worker thread; apply_battle_events() takes in their rounds and results
+    battle_worker = BattleWorker()
+    fights = {}  # job -> (history entry, stage rewards)
+
+    def apply_battle_events():
+        for kind, job, data in battle_worker.poll():
+            entry, prize = fights[job]
+            if kind == ROUND:
+                entry["rounds"].append(data[1])
+                continue
+            del fights[job]
+            entry.pop("pending", None)
+            if kind == DONE:
+                entry.update(title=data["title"], player_win=data["player_win"], turns=data["turns"], log=data["log"])
+                if data["player_win"]:
+                    for item, amount in prize.items():
+                        inventory[item] = inventory.get(item, 0) + amount
+            else:
+                entry.update(title=entry["title"] + " (failed)", player_win=None)
+            autosaver.request("game")
 
     menu_options = [
         {"label":"View Roster","screen":"roster"},
@@ -1079,44 +1153,53 @@ def main():
         {"label":"Battle History","screen":"battle_history"},
     ]
 
+    # scroll state of the long lists; only their visible rows are drawn
+    roster_view = roster_list()
+    details_view = details_list()
+
     running = True
     while running:
-        screen.fill((8,12,30))
+        canvas.fill((8,12,30))
         fight_btn = back_btn = back_button = None
 
-        # Draw screens
-        if current_screen == "menu":
-            draw_menu(screen, font, [opt["label"] for opt in menu_options], selected)
-        elif current_screen == "roster":
-            draw_roster(screen, font, roster, selected)
-            back_button = draw_back_button(screen, button_font)
-        elif current_screen == "inventory":
-            draw_inventory(screen, font, inventory)
-            back_button = draw_back_button(screen, button_font)
-        elif current_screen == "battle_history":
-            draw_battle_history(screen, font, battle_history, selected)
-            back_button = draw_back_button(screen, button_font)
-        elif current_screen == "battle_details" and battle_history:
-            draw_battle_details(screen, font, battle_history[detail_index])
-            back_button = draw_back_button(screen, button_font)
-        elif current_screen == "reward_preview":
-            fight_btn, back_btn = draw_reward_preview(screen, font, stage, rewards)
+        # Draw screens (timed per screen when instrumentation is on)
+        frame_screen = current_screen
+        with instrument.timer("draw." + frame_screen):
+            if current_screen == "menu":
+                draw_menu(canvas, font, [opt["label"] for opt in menu_options], selected)
+            elif current_screen == "roster":
+                draw_roster(canvas, font, roster, selected, roster_view)
+                back_button = draw_back_button(canvas, button_font)
+            elif current_screen == "inventory":
+                draw_inventory(canvas, font, inventory)
+                back_button = draw_back_button(canvas, button_font)
+            elif current_screen == "battle_history":
+                draw_battle_history(canvas, font, battle_history, selected)
+                back_button = draw_back_button(canvas, button_font)
+            elif current_screen == "battle_details" and battle_history:
+                draw_battle_details(canvas, font, battle_history[detail_index], details_view)
+                back_button = draw_back_button(canvas, button_font)
+            elif current_screen == "reward_preview":
+                fight_btn, back_btn = draw_reward_preview(canvas, font, stage, rewards)
 
         # Overlay: last battle brief
         if last_battle_log:
             y = 420
-            rounds = last_battle_log.get("rounds", [])
+            rounds = entry_rounds(last_battle_log)
             if rounds:
                 for line in rounds[-1]:
-                    screen.blit(font.render(line, True, (255,200,200)), (50, y))
+                    draw_text(canvas, font, line, 50, y, (255,200,200))
                     y += 18
             else:
-                screen.blit(font.render(f"Result: {last_battle_log.get('result','?')}", True, (255,200,200)), (50, y))
+                draw_text(canvas, font, f"Result: {last_battle_log.get('result','?')}", 50, y, (255,200,200))
+
+        if show_stats:
+            draw_stats_overlay(canvas, button_font, instrument.stats())
 
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                roster.save_to_file("roster_save.json")
+                autosaver.save_all()
                 running = False
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -1131,18 +1214,15 @@ def main():
 
                 if current_screen == "reward_preview" and fight_btn and back_btn:
                     if fight_btn.collidepoint((mx,my)):
-                        team_copy = [deepcopy(h) for h in roster.get_team(5)]
-                        enemies_copy = [deepcopy(e) for e in generate_enemy_team(stage, enemy_templates)]
-
-                        last_battle_log = battle(team_copy, enemies_copy)
+                        # fought on the battle thread; rounds stream into the entry, rewards come with the result
+                        last_battle_log = {"title": f"Stage {stage} battle", "rounds": [], "pending": True}
+                        job = battle_worker.submit(roster.get_team(5), generate_enemy_team(stage, enemy_templates, characters=False),
+                                                 skills=True)
+                        fights[job] = (last_battle_log, rewards)
                         battle_history.append(last_battle_log)
                         if len(battle_history) > MAX_BATTLE_HISTORY:
                             battle_history.pop(0)
 
-                        if last_battle_log.get("player_win"):
-                            for item, amount in rewards.items():
-                                inventory[item] = inventory.get(item, 0) + amount
-
                         stage += 1
                         current_screen = "menu"
 
@@ -1150,12 +1230,10 @@ def main():
                         current_screen = "menu"
 
                 # Roster selection
-                if current_screen == "roster":
-                    base_x, base_y = 40, 80
-                    for i,h in enumerate(roster.heroes):
-                        rect = Rect(base_x, base_y+i*28, 420,24)
-                        if rect.collidepoint((mx,my)):
-                            selected=i; break
+                if current_screen == "roster" and event.button == 1:
+                    i = roster_view.hit_test((mx,my))
+                    if i is not None:
+                        selected=i
 
                 # Battle history click
                 if current_screen == "battle_history" and battle_history:
@@ -1168,8 +1246,18 @@ def main():
                             selected=i
                             break
 
+            elif event.type == pygame.MOUSEWHEEL:
+                if current_screen == "roster":
+                    roster_view.scroll(-event.y*3)
+                elif current_screen == "battle_details":
+                    details_view.scroll(-event.y*3)
+
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
+                if event.key == pygame.K_F3:
+                    # debug overlay; instrumentation runs while it shows (always with WUKONG_PROFILE)
+                    show_stats = not show_stats
+                    instrument.enable(show_stats or profile_file is not None)
+                elif event.key == pygame.K_ESCAPE:
                     if current_screen != "menu":
                         if current_screen=="battle_details":
                             current_screen="battle_history"
@@ -1178,7 +1266,7 @@ def main():
                             current_screen="menu"
                             selected=0
                     else:
-                        roster.save_to_file("roster_save.json")
+                        autosaver.save_all()
                         running=False
 
                 elif current_screen=="menu":
@@ -1188,13 +1276,14 @@ def main():
                         option = menu_options[selected]
                         if "screen" in option:
                             current_screen=option["screen"]; selected=0
+                            roster_view.top=0
                         elif "action" in option and option["action"]=="campaign_battle":
                             rewards = get_stage_rewards(stage)
                             current_screen="reward_preview"
 
                 elif current_screen=="roster":
-                    if event.key==pygame.K_DOWN: selected=min(len(roster.heroes)-1,selected+1)
-                    elif event.key==pygame.K_UP: selected=max(0,selected-1)
+                    if event.key in (pygame.K_UP, pygame.K_DOWN, pygame.K_PAGEUP, pygame.K_PAGEDOWN, pygame.K_HOME, pygame.K_END):
+                        selected=roster_view.move(selected, event.key)
                     elif event.key==pygame.K_RETURN:
                         detail=roster.heroes[selected].to_dict()
                         fake={"title":f"Hero: {detail.get('name')}", "rounds":[ [f"Level {detail.get('level')} {detail.get('cls')}"] ], "player_win":None}
@@ -1216,13 +1305,31 @@ def main():
                 elif current_screen=="battle_details":
                     if event.key==pygame.K_RETURN:
                         current_screen="battle_history"; selected=detail_index
+                    else:
+                        details_view.page(event.key)
 
-        pygame.display.flip()
+        apply_battle_events()
+        autosaver.tick()
+        with instrument.timer("present." + frame_screen):
+            canvas.present()
         clock.tick(30)
 
+    # finish fights still in flight so their rewards are saved
+    battle_worker.close()
+    apply_battle_events()
+    autosaver.close()
+    if profile_file:
+        instrument.dump_json(profile_file)
     pygame.quit()
     sys.exit()
 
 
 if __name__=="__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Sun Wukong Idle")
+    parser.add_argument("--headless", action="store_true", help="no window: apply offline progress, fight, save and exit")
+    parser.add_argument("-n", "--battles", type=int, default=0, help="campaign battles to fight with --headless")
+    args = parser.parse_args()
+    if args.headless:
+        headless(args.battles)
+    else:
+        main()
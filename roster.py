@@ -1,34 +1,392 @@
-import json
-from character import Character
+import json, sys, threading
+from array import array
+from collections import OrderedDict
+from character import Character, compute_stats, shared_skills
+from roster_file import RecordFile
+from skills import compile_skills
+import instrument
+
+# Numeric base stats kept as one typed column each; NaN marks a stat the hero doesn't have
+STAT_COLUMNS = ("hp", "attack", "defense", "crit_rate", "crit_dmg",
+                "speed", "dodge", "accuracy", "armor_pierce", "energy")
+_MISSING = float("nan")
+STATS_CACHE_SIZE = 1024  # heroes whose current_stats are kept; a team or a screen of the list
+
+class RosterStore:
+    """
+    Struct-of-arrays storage for a roster: numeric stats live in typed arrays indexed by
+    hero slot, strings are interned and skills are the template's shared tuple.
+    Indexing returns lightweight HeroView objects, so it can stand in for a list of Characters.
+    A store opened from a RecordFile reads each hero's record the first time it is accessed.
+    """
+    def __init__(self):
+        self.stats = {k: array("d") for k in STAT_COLUMNS}
+        self.level = array("i")
+        self.stars = array("i")
+        self.awakened = array("b")
+        self.int_stats = array("H")  # bit i set when STAT_COLUMNS[i] was given as an int
+        self.ids = []
+        self.names = []
+        self.rarity = []
+        self.cls = []
+        self.skills = []
+        self.extra_stats = {}   # slot -> {stat: value} for stats outside STAT_COLUMNS
+        self._stats_cache = OrderedDict()  # slot -> current_stats (LRU), dropped when level/stars/awakened change
+        self._stats_lock = threading.Lock()
+        self.records = None     # RecordFile backing this store, if any
+        self._unread = None     # bytearray, 1 for slots whose record hasn't been read yet
+        self._read_lock = threading.Lock()  # record reads, and swapping self.records
+        self.dirty = {}         # slot -> change number, for slots changed since the last save
+        self._changes = 0
+        self._dirty_lock = threading.Lock()
+
+    @classmethod
+    def from_records(cls, records):
+        """Store with one slot per record; heroes are read lazily on first access."""
+        store = cls()
+        n = len(records)
+        for col in (*store.stats.values(), store.level, store.stars, store.awakened, store.int_stats):
+            col.frombytes(bytes(col.itemsize * n))
+        for col in (store.ids, store.names, store.rarity, store.cls, store.skills):
+            col.extend([None] * n)
+        store.records = records
+        store._unread = bytearray(b"\1") * n
+        return store
+
+    def _ensure(self, slot):
+        if self._unread and self._unread[slot]:
+            with self._read_lock:
+                # another thread may have read it while this one waited
+                if self._unread[slot]:
+                    self._fill_dict(slot, self.records.read(slot))
+                    self._unread[slot] = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("roster index out of range")
+        self._ensure(i)
+        return HeroView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def add(self, hero_id, name, rarity, cls, base_stats, skills, level=1, stars=1, awakened=False):
+        """Appends a hero and returns its slot."""
+        slot = len(self.ids)
+        for col in (*self.stats.values(), self.level, self.stars, self.awakened, self.int_stats):
+            col.append(0)
+        for col in (self.ids, self.names, self.rarity, self.cls, self.skills):
+            col.append(None)
+        if self._unread is not None:
+            self._unread.append(0)
+        self._fill(slot, hero_id, name, rarity, cls, base_stats, skills, level, stars, awakened)
+        self._mark_dirty(slot)
+        return slot
+
+    def _fill(self, slot, hero_id, name, rarity, cls, base_stats, skills, level, stars, awakened):
+        self._fill_stats(slot, base_stats)
+        self.level[slot] = level
+        self.stars[slot] = stars
+        self.awakened[slot] = bool(awakened)
+        self.ids[slot] = sys.intern(hero_id)
+        self.names[slot] = sys.intern(name if name else hero_id)
+        self.rarity[slot] = sys.intern(rarity)
+        self.cls[slot] = sys.intern(cls)
+        self.skills[slot] = shared_skills(hero_id, rarity, skills)
+
+    def add_character(self, ch):
+        return self.add(ch.id, ch.name, ch.rarity, ch.cls, ch.base_stats, ch.skills,
+                        ch.level, ch.stars, ch.awakened)
+
+    def add_dict(self, d):
+        """Adds a hero in Character.to_dict() format without building a Character."""
+        return self.add(*_dict_fields(d))
+
+    def _fill_stats(self, slot, base_stats):
+        int_bits = 0
+        for i, (k, col) in enumerate(self.stats.items()):
+            v = base_stats.get(k, _MISSING)
+            col[slot] = v
+            if isinstance(v, int):
+                int_bits |= 1 << i
+        self.int_stats[slot] = int_bits
+        extra = {k: v for k, v in base_stats.items() if k not in self.stats}
+        if extra:
+            self.extra_stats[slot] = extra
+        else:
+            self.extra_stats.pop(slot, None)
+
+    def _fill_dict(self, slot, d):
+        self._fill(slot, *_dict_fields(d))
+
+    def base_stats(self, slot):
+        self._ensure(slot)
+        int_bits = self.int_stats[slot]
+        stats = {}
+        for i, (k, col) in enumerate(self.stats.items()):
+            v = col[slot]
+            if v == v:
+                stats[k] = int(v) if int_bits >> i & 1 else v
+        stats.update(self.extra_stats.get(slot, ()))
+        return stats
+
+    def current_stats(self, slot):
+        cache = self._stats_cache
+        with self._stats_lock:
+            stats = cache.get(slot)
+            if stats is not None:
+                cache.move_to_end(slot)
+                return stats
+        self._ensure(slot)
+        stats = compute_stats(self.ids[slot], self.rarity[slot], self.level[slot], self.stars[slot],
+                              bool(self.awakened[slot]), self.base_stats(slot))
+        with self._stats_lock:
+            cache[slot] = stats
+            if len(cache) > STATS_CACHE_SIZE:
+                cache.popitem(last=False)
+        return stats
+
+    def set_base_stats(self, slot, base_stats):
+        """Replaces a hero's base stats (the dict is copied into the columns)."""
+        self._ensure(slot)
+        self._fill_stats(slot, base_stats)
+        with self._stats_lock:
+            self._stats_cache.pop(slot, None)
+        self._mark_dirty(slot)
+
+    def set_progress(self, slot, level=None, stars=None, awakened=None):
+        """Updates level/stars/awakened of a hero, recomputing its stats only if something changed."""
+        self._ensure(slot)
+        changed = False
+        for col, value in ((self.level, level), (self.stars, stars), (self.awakened, awakened)):
+            if value is not None and col[slot] != value:
+                col[slot] = value
+                changed = True
+        if changed:
+            with self._stats_lock:
+                self._stats_cache.pop(slot, None)
+            self._mark_dirty(slot)
+
+    def _mark_dirty(self, slot):
+        with self._dirty_lock:
+            self._changes += 1
+            self.dirty[slot] = self._changes
+
+    def _mark_saved(self, saved):
+        """Clears dirty slots that haven't changed again since the snapshot saved (slot -> change number)."""
+        with self._dirty_lock:
+            for slot, change in saved.items():
+                if self.dirty.get(slot) == change:
+                    del self.dirty[slot]
+
+    def save(self, filename):
+        """
+        Saves in RecordFile format. Saving back to the file the store was opened from
+        only rewrites dirty heroes; any other target gets a full write.
+        """
+        self.save_job(filename)()
+
+    def save_job(self, filename):
+        """
+        Takes what save() would write now and returns a function that writes it, so the
+        write can run on another thread (see autosave.AutoSaver).
+        """
+        # dirty slots stay dirty until their write finishes, so a save job that is dropped
+        # or replaced before running loses nothing: the next snapshot still includes them
+        with self._dirty_lock:
+            saved = dict(self.dirty)
+        records = self.records
+        if records is not None and records.filename == filename:
+            changed = [(slot, self[slot].to_dict()) for slot in sorted(saved)]
+
+            def write_changed():
+                # a full write queued earlier may have replaced the file since; use the current one
+                with instrument.timer("io.save_roster_changed"):
+                    self.records.write(changed)
+                if self.records.should_compact():
+                    old = self.records
+                    with instrument.timer("io.compact_roster"):
+                        new = old.compact()
+                    # a hero being read from the old file (see _ensure) is finished before it closes
+                    with self._read_lock:
+                        self.records = new
+                    old.close()
+                self._mark_saved(saved)
+            return write_changed
+
+        # full write from a copy of the columns; read any unread records first
+        for slot in range(len(self)):
+            self._ensure(slot)
+        snap = self.copy()
+
+        def write_all():
+            old = self.records
+            with instrument.timer("io.save_roster_full"):
+                self.records = RecordFile.create(filename, ((slot, h.to_dict()) for slot, h in enumerate(snap)))
+            self._mark_saved(saved)
+            if old is not None:
+                old.close()
+        return write_all
+
+    @instrument.timed("copy.roster_store")
+    def copy(self):
+        """Copy of the columns (skills tuples are shared); not backed by a file."""
+        store = RosterStore()
+        store.stats = {k: array("d", col) for k, col in self.stats.items()}
+        for name in ("level", "stars", "awakened", "int_stats"):
+            setattr(store, name, array(getattr(self, name).typecode, getattr(self, name)))
+        for name in ("ids", "names", "rarity", "cls", "skills"):
+            setattr(store, name, list(getattr(self, name)))
+        store.extra_stats = {slot: dict(extra) for slot, extra in self.extra_stats.items()}
+        return store
+
+def _dict_fields(d):
+    return (d["id"], d.get("name", d.get("id")), d.get("rarity","rare"), d.get("class","Warrior"),
+            d.get("base_stats",{}), d.get("skills",[]),
+            d.get("level",1), d.get("stars",1), d.get("awakened",False))
+
+class HeroView:
+    """Character-like view of one RosterStore slot; holds no stats of its own."""
+    __slots__ = ("store", "slot")
+
+    def __init__(self, store, slot):
+        self.store = store
+        self.slot = slot
+
+    def __eq__(self, other):
+        return isinstance(other, HeroView) and other.store is self.store and other.slot == self.slot
+
+    def __hash__(self):
+        return hash((id(self.store), self.slot))
+
+    # copying a view detaches it into a standalone Character
+    def __copy__(self):
+        return self.to_character()
+
+    def __deepcopy__(self, memo):
+        return self.to_character()
+
+    @property
+    def id(self):
+        return self.store.ids[self.slot]
+
+    @property
+    def name(self):
+        return self.store.names[self.slot]
+
+    @property
+    def rarity(self):
+        return self.store.rarity[self.slot]
+
+    @property
+    def cls(self):
+        return self.store.cls[self.slot]
+
+    @property
+    def skills(self):
+        return self.store.skills[self.slot]
+
+    @property
+    def compiled_skills(self):
+        return compile_skills(self.store.skills[self.slot])
+
+    # a fresh dict on every read: edit it and assign it back to change the hero
+    @property
+    def base_stats(self):
+        return self.store.base_stats(self.slot)
+
+    @base_stats.setter
+    def base_stats(self, value):
+        self.store.set_base_stats(self.slot, value)
+
+    @property
+    def current_stats(self):
+        return self.store.current_stats(self.slot)
+
+    @property
+    def level(self):
+        return self.store.level[self.slot]
+
+    @level.setter
+    def level(self, value):
+        self.store.set_progress(self.slot, level=value)
+
+    @property
+    def stars(self):
+        return self.store.stars[self.slot]
+
+    @stars.setter
+    def stars(self, value):
+        self.store.set_progress(self.slot, stars=value)
+
+    @property
+    def awakened(self):
+        return bool(self.store.awakened[self.slot])
+
+    @awakened.setter
+    def awakened(self, value):
+        self.store.set_progress(self.slot, awakened=bool(value))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "rarity": self.rarity,
+            "class": self.cls,
+            "level": self.level,
+            "stars": self.stars,
+            "awakened": self.awakened,
+            "base_stats": self.base_stats,
+            "skills": self.skills
+        }
+
+    def to_character(self):
+        return Character.from_dict(self.to_dict())
 
 class Roster:
     def __init__(self):
-        self.heroes=[]
+        self.heroes=RosterStore()
 
     def load_templates_into_roster(self, templates_dict):
         # No auto-add; use add_from_template() externally
         pass
 
     def add_from_template(self, templ):
-        c=Character(templ["id"], templ["rarity"], templ["class"], templ["stats"], templ["skills"], display_name=templ.get("name",templ["id"]))
-        c.enforce_ability_counts()
-        self.heroes.append(c)
+        self.heroes.add(templ["id"], templ.get("name",templ["id"]), templ["rarity"], templ["class"], templ["stats"], templ["skills"])
 
     def add_hero(self, char_obj):
-        self.heroes.append(char_obj)
+        self.heroes.add_character(char_obj)
+
+    def save_to_file(self, filename="roster_save.dat"):
+        """Record-per-hero save (see roster_file.RecordFile); only changed heroes are rewritten."""
+        self.heroes.save(filename)
 
-    def save_to_file(self, filename="roster_save.json"):
-        data=[h.to_dict() for h in self.heroes]
-        with open(filename,"w") as f:
-            json.dump(data,f, indent=2)
+    def save_job(self, filename="roster_save.dat"):
+        """save_to_file split into a snapshot (now) and a write (returned function)."""
+        return self.heroes.save_job(filename)
 
-    def load_from_file(self, filename="roster_save.json"):
+    @instrument.timed("io.load_roster")
+    def load_from_file(self, filename="roster_save.dat"):
+        """Opens a RecordFile save lazily, or reads a legacy JSON list save."""
+        if RecordFile.is_record_file(filename):
+            self.heroes=RosterStore.from_records(RecordFile.open(filename))
+            return
+        self.heroes=RosterStore()
         try:
             with open(filename,"r") as f:
                 data=json.load(f)
-            self.heroes=[Character.from_dict(d) for d in data]
+            for d in data:
+                self.heroes.add_dict(d)
         except FileNotFoundError:
-            self.heroes=[]
+            pass
 
     def get_team(self,n=5):
         return self.heroes[:n]
@@ -0,0 +1,199 @@
+# roster_file.py
+import json, os
+from array import array
+from save_load import atomic_write
+import instrument
+
+MAGIC = b"WKROSTER1\n"
+INDEX_FIELDS = 3  # offset, capacity, length of each slot's record
+COMPACT_MIN_BYTES = 1 << 20  # dead space worth a rewrite: superseded records, torn tails
+
+class RecordFile:
+    """
+    Record-per-hero roster save with a fixed-width index.
+
+    <file>      MAGIC, then one line per record: b"<slot> <json>" (older saves pad it with spaces)
+    <file>.idx  array of uint64 (offset, capacity, length) per slot
+
+    Changed records are appended and never overwrite the ones the index points at; the index
+    is swapped in only once they are on disk, so a crash mid-save leaves the previous save.
+    A save costs O(changed heroes) plus the index rewrite. Records are read one at a time on
+    demand. A record file may be read by one thread while another writes it, as long as the
+    writer only touches slots the reader has already loaded.
+    Superseded records stay behind as dead space until compact() rewrites the file
+    (should_compact: once dead space outgrows the live records).
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.index_file = filename + ".idx"
+        self.index = array("Q")
+        self.size = 0  # bytes in the data file
+        self.live = 0  # bytes of MAGIC and the records the index points at
+        self._f = None
+
+    def __len__(self):
+        return len(self.index) // INDEX_FIELDS
+
+    @staticmethod
+    def is_record_file(filename):
+        try:
+            with open(filename, "rb") as f:
+                return f.read(len(MAGIC)) == MAGIC
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def open(cls, filename):
+        _recover(filename)
+        rf = cls(filename)
+        rf._f = open(filename, "r+b")
+        try:
+            with open(rf.index_file, "rb") as f:
+                rf.index.frombytes(f.read())
+        except FileNotFoundError:
+            rf.rebuild_index()
+        rf._measure()
+        return rf
+
+    @classmethod
+    def create(cls, filename, records):
+        """Writes a fresh file from (slot, dict) pairs in slot order, swapped in with _replace."""
+        rf = cls(filename)
+        data_out = bytearray(MAGIC)
+        for slot, d in records:
+            data = rf._encode(slot, d)
+            rf.index.extend((len(data_out), len(data), len(data)))
+            data_out += data + b"\n"
+        _replace(filename, data_out, rf.index.tobytes())
+        rf._f = open(filename, "r+b")
+        rf._measure()
+        return rf
+
+    def close(self):
+        if self._f:
+            self._f.close()
+            self._f = None
+
+    def read(self, slot):
+        instrument.count("io.roster_record_reads")
+        i = slot * INDEX_FIELDS
+        offset, length = self.index[i], self.index[i + 2]
+        # pread leaves the file position alone, so reads are safe while a saver thread writes
+        data = os.pread(self._f.fileno(), length, offset)
+        return json.loads(data[data.index(b" ") + 1:])
+
+    def write(self, changed):
+        """Appends the (slot, dict) pairs in changed, then swaps in the index pointing at them."""
+        f = self._f
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        out = bytearray()
+        if os.pread(f.fileno(), 1, end - 1) != b"\n":
+            out += b"\n"  # a torn record from a crashed save: start on a line of our own
+        index = array("Q", self.index)
+        live = self.live
+        for slot, d in changed:
+            data = self._encode(slot, d)
+            i = slot * INDEX_FIELDS
+            if i >= len(index):
+                index.extend([0] * (i + INDEX_FIELDS - len(index)))
+            elif index[i + 2]:
+                live -= index[i + 1] + 1
+            live += len(data) + 1
+            index[i:i + INDEX_FIELDS] = array("Q", (end + len(out), len(data), len(data)))
+            out += data + b"\n"
+        f.write(out)
+        f.flush()
+        os.fsync(f.fileno())
+        # data first, then the index that points at it
+        atomic_write(self.index_file, index.tobytes())
+        self.index = index
+        self.size = end + len(out)
+        self.live = live
+
+    def should_compact(self):
+        dead = self.size - self.live
+        return dead > COMPACT_MIN_BYTES and dead > self.live
+
+    def compact(self):
+        """
+        Rewrites the file with only the records the index points at, in slot order, and
+        returns the RecordFile over it. This one keeps reading the old file until closed.
+        """
+        fd = self._f.fileno()
+        rf = RecordFile(self.filename)
+        data_out = bytearray(MAGIC)
+        index = self.index
+        for i in range(0, len(index), INDEX_FIELDS):
+            offset, length = index[i], index[i + 2]
+            if length:
+                rf.index.extend((len(data_out), length, length))
+                data_out += os.pread(fd, length, offset) + b"\n"
+            else:
+                rf.index.extend((0, 0, 0))
+        _replace(self.filename, data_out, rf.index.tobytes())
+        rf._f = open(self.filename, "r+b")
+        rf._measure()
+        return rf
+
+    def rebuild_index(self):
+        """
+        Recovers the index by scanning the records; the last record of a slot wins and
+        records torn by a crash are skipped.
+        """
+        self.index = array("Q")
+        f = self._f
+        f.seek(len(MAGIC))
+        offset = f.tell()
+        for line in iter(f.readline, b""):
+            data = line.rstrip(b" \n")
+            if data and line.endswith(b"\n") and _complete(data):
+                slot = int(data[:data.index(b" ")])
+                if slot >= len(self):
+                    self.index.extend([0] * (INDEX_FIELDS * (slot + 1 - len(self))))
+                i = slot * INDEX_FIELDS
+                self.index[i:i + INDEX_FIELDS] = array("Q", (offset, len(line) - 1, len(data)))
+            offset += len(line)
+        atomic_write(self.index_file, self.index.tobytes())
+
+    def _measure(self):
+        self.size = os.fstat(self._f.fileno()).st_size
+        caps = self.index[1::INDEX_FIELDS]
+        lengths = self.index[2::INDEX_FIELDS]
+        self.live = len(MAGIC) + sum(c + 1 for c, n in zip(caps, lengths) if n)
+
+    @staticmethod
+    def _encode(slot, d):
+        return f"{slot} ".encode() + json.dumps(d, separators=(",", ":")).encode()
+
+def _complete(data):
+    try:
+        json.loads(data[data.index(b" ") + 1:])
+        return True
+    except ValueError:
+        return False
+
+def _replace(filename, data, index):
+    """
+    Swaps in a new data file and its index. Both are written to .new files first and
+    replacing the data file is the commit point: _recover finishes or drops a swap that a
+    crash interrupted.
+    """
+    for path, content in ((filename + ".new", data), (filename + ".idx.new", index)):
+        with open(path, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(filename + ".new", filename)
+    os.replace(filename + ".idx.new", filename + ".idx")
+
+def _recover(filename):
+    """Completes or rolls back an interrupted _replace of filename."""
+    data_new, index_new = filename + ".new", filename + ".idx.new"
+    if os.path.exists(index_new):
+        if os.path.exists(data_new):
+            os.remove(index_new)  # the data file was never replaced: keep the old pair
+        else:
+            os.replace(index_new, filename + ".idx")
+    if os.path.exists(data_new):
+        os.remove(data_new)
@@ -1,13 +1,49 @@
 import json, os
+from copy import deepcopy
+import snapshot
+import instrument
 
-SAVE_FILE = "save.json"
+SAVE_FILE = "save.json"          # legacy JSON save, still read if no snapshot exists
+SNAPSHOT_FILE = "save.snap"
+
+@instrument.timed("io.atomic_write")
+def atomic_write(filename, data, tmp=None):
+    """Writes bytes to a temp file next to filename, then swaps it in with os.replace."""
+    tmp = tmp or filename + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
 
 def save_game(data):
-    with open(SAVE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    save_game_job(data)()
+
+def save_game_job(data):
+    """Copies data now and returns a function that serializes and writes the copy (for AutoSaver)."""
+    with instrument.timer("copy.save_game"):
+        state = deepcopy(data)
 
+    def write():
+        with instrument.timer("io.save_game"):
+            atomic_write(SNAPSHOT_FILE, snapshot.dumps(state))
+    return write
+
+@instrument.timed("io.load_game")
 def load_game():
+    if os.path.exists(SNAPSHOT_FILE):
+        with snapshot.load(SNAPSHOT_FILE) as snap:
+            return snap.value()
     if os.path.exists(SAVE_FILE):
         with open(SAVE_FILE, "r") as f:
             return json.load(f)
     return {}
+
+def load_templates(filename):
+    """Load JSON templates as a list of dicts."""
+    with open(filename, "r") as f:
+        data = json.load(f)
+        # Convert dict to list if needed
+        if isinstance(data, dict):
+            return list(data.values())
+        return data
@@ -0,0 +1,31 @@
+# seeding.py
+import hashlib, random
+
+def derive_seed(seed, *keys):
+    """
+    64-bit seed derived from a seed and any keys (stage, team, battle index...).
+    Stable across processes and runs, unlike hash().
+    """
+    data = repr((seed,) + keys).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+def make_rng(rng):
+    """Random source for rng: None -> the global random module, an int/str seed -> a new random.Random."""
+    if rng is None:
+        return random
+    if isinstance(rng, random.Random):
+        return rng
+    return random.Random(rng)
+
+def battle_seeds(seed, index=0):
+    """
+    (enemy_seed, crit_seed) for battle number `index` of a seeded run. Every battle gets its
+    own sub-seeds and the enemy picks and crit rolls separate streams, so a battle replays
+    the same way whichever worker runs it and in whatever order.
+    """
+    return derive_seed(seed, index, "enemies"), derive_seed(seed, index, "crits")
+
+def battle_streams(seed, index=0):
+    """battle_seeds as (enemy_rng, crit_rng) random.Random instances."""
+    enemy_seed, crit_seed = battle_seeds(seed, index)
+    return random.Random(enemy_seed), random.Random(crit_seed)
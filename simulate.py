@@ -0,0 +1,80 @@
+# simulate.py
+import numpy as np
+from battle import deepcopy_char_stats
+from battle_np import MAX_EXACT, STAT_COLS, side_attacks
+from campaign import enemy_unit
+
+def unit_row(ch):
+    """Battle stats of one unit as a tuple ordered like STAT_COLS."""
+    u = deepcopy_char_stats(ch)
+    return tuple(u[k] for k in STAT_COLS)
+
+def enemy_stat_table(enemy_templates, stages):
+    """
+    Stats of every enemy template at every stage, as built by campaign.enemy_unit.
+    Returns float64 array of shape (len(stages), len(enemy_templates), len(STAT_COLS))
+    """
+    return np.array([[unit_row(enemy_unit(t, s)) for t in enemy_templates] for s in stages],
+                    dtype=np.float64)
+
+def _check_exact(stats):
+    if stats[..., 0].max() >= MAX_EXACT or (stats[..., 1] * np.maximum(stats[..., 4], 1)).max() >= MAX_EXACT:
+        raise ValueError("Stats too large for simulate_many (stage too high); use battle.battle")
+
+def simulate_many(team, enemy_templates, stage, n, max_turns=60, rng=None):
+    """
+    Runs n independent battles of team against random enemy teams at once, with the same
+    rules as battle.battle. Stats are stacked into (n_battles, 5) arrays and all crit rolls
+    of a round come from one RNG call.
+    stage: int, or a sequence of stages to run n battles each (whole stage curve in one call)
+    Returns dict with keys: win_rate, turns (histogram indexed by rounds fought),
+    timeouts, mean_surviving_hp; or {stage: dict} when stage is a sequence.
+    """
+    rng = np.random.default_rng(rng)
+    stages = np.atleast_1d(stage)
+    n_total = len(stages) * n
+
+    # player team is identical in every battle
+    ally = np.array([unit_row(c) for c in team], dtype=np.float64)
+    _check_exact(ally)
+    a_hp = np.repeat(ally[None, :, 0], n_total, axis=0).astype(np.int64)
+    a_atk, a_def, a_cr, a_cd = (np.broadcast_to(ally[:, i], (n_total, len(team))) for i in range(1, 5))
+
+    # every battle draws its own 5 enemies, scaled by its stage
+    table = enemy_stat_table(enemy_templates, stages)
+    _check_exact(table)
+    picks = rng.integers(0, len(enemy_templates), size=(n_total, 5))
+    enemy = table[np.repeat(np.arange(len(stages)), n)[:, None], picks]
+    e_hp = enemy[:, :, 0].astype(np.int64)
+    e_atk, e_def, e_cr, e_cd = (enemy[:, :, i] for i in range(1, 5))
+
+    win = np.zeros(n_total, dtype=bool)
+    ended = np.full(n_total, max_turns, dtype=np.int64)
+    running = np.ones(n_total, dtype=bool)
+    turn = 1
+    while turn <= max_turns and running.any():
+        rolls = rng.random((n_total, len(team) + 5))
+        side_attacks(a_atk, a_cr, a_cd, rolls[:, :len(team)], a_hp, e_hp, e_def)
+        side_attacks(e_atk, e_cr, e_cd, rolls[:, len(team):], e_hp, a_hp, a_def)
+
+        # check end (player loss is checked first, as in battle())
+        lost = running & ~(a_hp > 0).any(axis=1)
+        won = running & ~lost & ~(e_hp > 0).any(axis=1)
+        win |= won
+        ended[lost | won] = turn
+        running &= ~(lost | won)
+        turn += 1
+
+    surviving = np.clip(a_hp, 0, None).sum(axis=1)
+    results = {}
+    for i, s in enumerate(stages):
+        sl = slice(i * n, (i + 1) * n)
+        results[int(s)] = {
+            "win_rate": float(win[sl].mean()),
+            "turns": np.bincount(ended[sl], minlength=max_turns + 1),
+            "timeouts": int(running[sl].sum()),
+            "mean_surviving_hp": float(surviving[sl].mean()),
+        }
+    if np.ndim(stage) == 0:
+        return results[int(stage)]
+    return results
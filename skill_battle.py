@@ -0,0 +1,209 @@
+# skill_battle.py
+"""
+Battles with skills: battle(..., skills=True) lands here.
+
+Each unit uses its compiled skills (skills.compile_skills, cached per template): on its
+action it gains 10 energy and runs the first skill by priority it can pay for, or a
+basic attack. Hits roll accuracy against dodge, armor pierce lowers the defense
+mitigation, taunting units draw single-target attacks and stunned units skip their actions.
+Units act in ATB order (see initiative.py): a unit of the fight's average speed acts once
+per round, at its end, faster ones more often. A round also ends as soon as a side is wiped out; the
+end checks are the same as the plain battle.
+"""
+from battle import BattleUnit, battle_result, template_stats
+from battle_log import BattleLog, LOG_FULL, LOG_NONE, HIT, MISS, HEAL, BUFF, DEBUFF, STUN, STUNNED, ENERGY, TAUNT
+from initiative import Initiative
+from seeding import make_rng
+from status import StatusBoard
+from skills import compile_skills, BASIC_ATTACK, SkillSet
+
+ENERGY_PER_ACTION = 10
+MAX_ENERGY = 100
+EXTRA_VS_MULT = 1.2  # damage skills with extra_vs against that class
+_NO_SKILLS = SkillSet()
+
+def unit_skills(ch):
+    """Compiled skills of a Character, HeroView or unit dict."""
+    compiled = getattr(ch, "compiled_skills", None)
+    if compiled is not None:
+        return compiled
+    skills = ch.get("skills") if isinstance(ch, dict) else None
+    return compile_skills(skills) if skills else _NO_SKILLS
+
+class SkillUnit(BattleUnit):
+    """BattleUnit with the stats and state skills use."""
+    __slots__ = ("index", "side", "cls", "dodge", "accuracy", "armor_pierce", "ignore_def", "skills",
+                 "stunned", "taunt_until", "has_struck")
+
+    def __init__(self, ch, index, side=0):
+        BattleUnit.__init__(self, ch)
+        stats = template_stats(ch)
+        self.index = index
+        self.side = side  # 0 allies, 1 enemies
+        self.cls = getattr(ch, "cls", ch.get("class") if isinstance(ch, dict) else None)
+        self.dodge = stats.get("dodge", 0.0)
+        self.accuracy = stats.get("accuracy", 1.0)
+        self.armor_pierce = stats.get("armor_pierce", 0.0)
+        self.ignore_def = 0.0
+        self.skills = unit_skills(ch)
+        self.stunned = 0
+        self.taunt_until = 0
+        self.has_struck = False
+        self.energy = min(MAX_ENERGY, self.energy)
+
+class SkillBattle:
+    """The running battle; compiled skills call back into it (see skills.py)."""
+
+    def __init__(self, allies, enemies, log, roll):
+        self.allies = allies
+        self.enemies = enemies
+        self.log = log
+        self.roll = roll
+        self.turn = 1
+        self.initiative = Initiative(allies + enemies)
+        self.statuses = StatusBoard()
+        self.alive = [sum(u.hp > 0 for u in allies), sum(u.hp > 0 for u in enemies)]
+
+    def target(self, foes):
+        """A taunting foe if there is one, else the first alive."""
+        first = None
+        for u in foes:
+            if u.hp > 0:
+                if u.taunt_until >= self.turn:
+                    return u
+                if first is None:
+                    first = u
+        return first
+
+    def strike(self, user, target, mult, pierce, extra_vs, skill):
+        roll = self.roll
+        log = self.log
+        if roll() >= min(0.99, max(0.05, user.accuracy - target.dodge)):
+            if log:
+                log.event(self.turn, user.index, target.index, 0, MISS, skill)
+            return
+        defense = target.defense
+        mitigation = defense / (defense + 1000) * (1 - min(0.95, max(0.0, user.armor_pierce + pierce)))
+        if user.ignore_def and roll() < user.ignore_def:
+            mitigation = 0.0
+        if extra_vs is not None and target.cls == extra_vs:
+            mult *= EXTRA_VS_MULT
+        dmg = int(user.attack * mult * (1 - mitigation))
+        crit = roll() < user.crit_rate
+        if crit:
+            dmg = int(dmg * user.crit_dmg)
+        for mod in user.skills.damage_mods:
+            dmg = mod(user, target, dmg, crit)
+        dmg = max(0, dmg)
+        if target.hp > 0 >= target.hp - dmg:
+            self.alive[target.side] -= 1
+            self.initiative.remove(target.index)
+        target.hp -= dmg
+        user.has_struck = True
+        if log:
+            log.event(self.turn, user.index, target.index, dmg, HIT, skill, crit)
+
+    def heal(self, user, target, amount, skill):
+        amount = max(0, min(amount, target.max_hp - target.hp))
+        target.hp += amount
+        if self.log and (amount or skill is not None):
+            self.log.event(self.turn, user.index, target.index, amount, HEAL, skill)
+
+    def buff(self, user, target, stat, amount, turns, skill, kind=BUFF, is_percent=True):
+        if not hasattr(target, stat):
+            return
+        if kind == DEBUFF:
+            amount = -amount
+        if self.statuses.apply(target, (skill, kind), stat, amount, is_percent, self.turn + turns - 1) \
+                and stat == "speed":
+            self.initiative.reschedule(target.index)
+        if self.log:
+            self.log.event(self.turn, user.index, target.index, turns, kind, skill)
+
+    def debuff(self, user, target, stat, amount, turns, skill, is_percent=True):
+        self.buff(user, target, stat, amount, turns, skill, DEBUFF, is_percent)
+
+    def stun(self, user, target, turns, skill):
+        target.stunned = max(target.stunned, turns)
+        if self.log:
+            self.log.event(self.turn, user.index, target.index, turns, STUN, skill)
+
+    def give_energy(self, user, target, amount, skill):
+        target.energy = min(MAX_ENERGY, target.energy + amount)
+        if self.log:
+            self.log.event(self.turn, user.index, target.index, amount, ENERGY, skill)
+
+    def taunt(self, user, turns, skill):
+        user.taunt_until = self.turn + turns - 1
+        if self.log:
+            self.log.event(self.turn, user.index, user.index, turns, TAUNT, skill)
+
+    def act(self, unit, friends, foes):
+        if unit.stunned:
+            unit.stunned -= 1
+            if self.log:
+                self.log.event(self.turn, unit.index, unit.index, 0, STUNNED)
+            return
+        unit.energy = min(MAX_ENERGY, unit.energy + ENERGY_PER_ACTION)
+        skill = BASIC_ATTACK
+        for s in unit.skills.actives:
+            if s.cost <= unit.energy:
+                skill = s
+                break
+        unit.energy -= skill.cost
+        skill.run(self, unit, friends, foes)
+
+    def end_round(self):
+        for u in self.allies + self.enemies:
+            if u.hp <= 0:
+                continue
+            if u.skills.regen:
+                self.heal(u, u, int(u.max_hp * u.skills.regen), None)
+        for status in self.statuses.expire(self.turn):
+            if status.stat == "speed" and status.unit.hp > 0:
+                self.initiative.reschedule(status.unit.index)
+
+    def over(self):
+        return not self.alive[0] or not self.alive[1]
+
+def skill_battle(team_chars, enemy_chars, max_turns=60, log_level=LOG_FULL, on_round=None, rng=None):
+    """battle() with skills; same arguments and result."""
+    allies = [SkillUnit(c, i) for i, c in enumerate(team_chars)]
+    enemies = [SkillUnit(c, len(allies) + i, 1) for i, c in enumerate(enemy_chars)]
+    log = None
+    if log_level != LOG_NONE:
+        log = BattleLog([u.name for u in allies + enemies], max_turns, log_level)
+    for side in (allies, enemies):
+        for u in side:
+            for hook in u.skills.on_start:
+                hook(u, side)
+    ctx = SkillBattle(allies, enemies, log, make_rng(rng).random)
+    pop = ctx.initiative.pop
+    round_time = ctx.initiative.round_time
+
+    turn = 1
+    round_end = round_time
+    # an action landing on round_end still belongs to the ending round, whatever the float
+    # rounding of the summed action times (with equal speeds every action is on a boundary)
+    slack = round_time * 1e-9
+    while True:
+        unit, time = pop()
+        # close every round that ends before this action (or right away once a side is wiped out)
+        while time > round_end + slack or ctx.over():
+            ctx.end_round()
+            if on_round:
+                on_round(turn, log)
+            if not ctx.alive[0]:
+                return battle_result(False, f"Stage battle (turn {turn})", turn, log)
+            if not ctx.alive[1]:
+                return battle_result(True, f"Stage battle (turn {turn})", turn, log)
+            if turn == max_turns:
+                return battle_result(False, "Timed out", max_turns, log)
+            turn += 1
+            ctx.turn = turn
+            round_end += round_time
+        if unit.hp > 0:
+            if unit.side:
+                ctx.act(unit, enemies, allies)
+            else:
+                ctx.act(unit, allies, enemies)
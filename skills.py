@@ -0,0 +1,184 @@
+# skills.py
+"""
+Skill compiler: turns the effect dicts of data/heroes.json into callables once per
+template, so a battle resolves a skill with one call and no dict lookups.
+
+A compiled active is run(ctx, user, friends, foes); ctx is the running battle (see
+skill_battle.SkillBattle) and provides target(), strike(), heal(), buff(), debuff(),
+stun(), give_energy() and taunt(). Passives compile into start-of-battle stat changes,
+damage modifiers mod(user, target, dmg, crit) -> dmg and per-round regen.
+"""
+import threading
+from collections import OrderedDict
+
+# effect actions, in the order a unit prefers them when it can pay for several
+PRIORITY = {"ultimate": 0, "damage": 1, "debuff": 2, "buff": 3, "heal": 4, "energy": 5, "taunt": 6}
+
+COMPILED_CACHE_SIZE = 1024  # skill lists kept compiled; templates share one tuple each
+
+# compile_skills cache: id(skills) -> (skills, SkillSet), least recently used first
+_COMPILED = OrderedDict()
+_compiled_lock = threading.Lock()
+
+class CompiledSkill:
+    __slots__ = ("name", "cost", "run")
+
+    def __init__(self, name, cost, run):
+        self.name = name
+        self.cost = cost
+        self.run = run
+
+class SkillSet:
+    """A hero's compiled skills: actives by priority, passive hooks."""
+    __slots__ = ("actives", "on_start", "damage_mods", "regen")
+
+    def __init__(self, actives=(), on_start=(), damage_mods=(), regen=0.0):
+        self.actives = actives
+        self.on_start = on_start
+        self.damage_mods = damage_mods
+        self.regen = regen
+
+def compile_skills(skills):
+    """SkillSet for a skills list/tuple, compiled the first time this object is seen."""
+    key = id(skills)
+    with _compiled_lock:
+        hit = _COMPILED.get(key)
+        # the skills object is kept in the entry, so its id can't be reused while cached
+        if hit is not None and hit[0] is skills:
+            _COMPILED.move_to_end(key)
+            return hit[1]
+    actives, on_start, damage_mods, regen = [], [], [], 0.0
+    for order, s in enumerate(skills):
+        eff = s.get("effect") or {}
+        if s.get("type") == "passive":
+            start, mods, r = compile_passive(eff)
+            on_start += start
+            damage_mods += mods
+            regen += r
+        else:
+            run = compile_effect(s.get("name", "skill"), eff)
+            if run is not None:
+                rank = (PRIORITY.get(eff.get("action"), 9), -eff.get("mult", 0), order)
+                actives.append((rank, CompiledSkill(s.get("name", "skill"), s.get("energy_cost", 0), run)))
+    skill_set = SkillSet(tuple(c for _, c in sorted(actives, key=lambda a: a[0])),
+                         tuple(on_start), tuple(damage_mods), regen)
+    with _compiled_lock:
+        _COMPILED[key] = (skills, skill_set)
+        if len(_COMPILED) > COMPILED_CACHE_SIZE:
+            _COMPILED.popitem(last=False)
+    return skill_set
+
+def compile_effect(name, eff):
+    """Specialized run(ctx, user, friends, foes) for an active effect, None if unknown."""
+    action = eff.get("action")
+    mult = eff.get("mult", 1.0)
+    aoe = eff.get("aoe", False)
+    if action == "damage":
+        return _damage(name, mult, eff.get("pierce", 0.0), eff.get("extra_vs"), aoe)
+    if action == "heal":
+        if aoe:
+            def run(ctx, user, friends, foes):
+                amount = int(user.attack * mult)
+                for a in friends:
+                    if a.hp > 0:
+                        ctx.heal(user, a, amount, name)
+        else:
+            def run(ctx, user, friends, foes):
+                # the most hurt ally
+                target = min((a for a in friends if a.hp > 0), key=lambda a: a.hp / a.max_hp, default=user)
+                ctx.heal(user, target, int(user.attack * mult), name)
+        return run
+    if action in ("buff", "debuff"):
+        stat, amount, turns = eff.get("stat"), eff.get("amount", 0), eff.get("turns", 1)
+        is_percent = eff.get("is_percent", True)
+        target_type = eff.get("target", "ally" if action == "buff" else "enemy")
+        if action == "debuff":
+            def run(ctx, user, friends, foes):
+                for e in foes:
+                    if e.hp > 0:
+                        ctx.debuff(user, e, stat, amount, turns, name, is_percent)
+        elif target_type == "self":
+            def run(ctx, user, friends, foes):
+                ctx.buff(user, user, stat, amount, turns, name, is_percent=is_percent)
+        else:
+            def run(ctx, user, friends, foes):
+                for a in friends:
+                    if a.hp > 0:
+                        ctx.buff(user, a, stat, amount, turns, name, is_percent=is_percent)
+        return run
+    if action == "energy":
+        amount = eff.get("amount", 0)
+        def run(ctx, user, friends, foes):
+            for a in friends:
+                if a.hp > 0:
+                    ctx.give_energy(user, a, amount, name)
+        return run
+    if action == "taunt":
+        turns = eff.get("turns", 1)
+        def run(ctx, user, friends, foes):
+            ctx.taunt(user, turns, name)
+        return run
+    if action == "ultimate":
+        stun = eff.get("stun", 0)
+        hit = _damage(name, mult, 0.0, None, aoe) if eff.get("mult") else None
+        def run(ctx, user, friends, foes):
+            if stun:
+                target = ctx.target(foes)
+                if target is not None:
+                    ctx.stun(user, target, stun, name)
+            if hit:
+                hit(ctx, user, friends, foes)
+        return run
+    return None
+
+def _damage(name, mult, pierce, extra_vs, aoe):
+    if aoe:
+        def run(ctx, user, friends, foes):
+            for e in foes:
+                if e.hp > 0:
+                    ctx.strike(user, e, mult, pierce, extra_vs, name)
+    else:
+        def run(ctx, user, friends, foes):
+            target = ctx.target(foes)
+            if target is not None:
+                ctx.strike(user, target, mult, pierce, extra_vs, name)
+    return run
+
+# what a unit does when it can't pay for any skill; logged as a plain hit
+BASIC_ATTACK = CompiledSkill(None, 0, _damage(None, 1.0, 0.0, None, False))
+
+def compile_passive(eff):
+    """(start hooks, damage modifiers, regen) for a passive effect."""
+    start, mods, regen = [], [], eff.get("regen", 0.0)
+    if eff.get("ally_attack_pct"):
+        pct = eff["ally_attack_pct"]
+        start.append(lambda unit, friends: [_scale(a, "attack", 1 + pct) for a in friends])
+    if eff.get("ally_def_pct"):
+        pct = eff["ally_def_pct"]
+        start.append(lambda unit, friends: [_scale(a, "defense", 1 + pct) for a in friends])
+    if eff.get("crit_rate_add"):
+        add = eff["crit_rate_add"]
+        start.append(lambda unit, friends: setattr(unit, "crit_rate", unit.crit_rate + add))
+    if eff.get("ignore_def"):
+        chance = eff.get("chance", 0.0)
+        # flagged for strike(): with this chance the hit ignores defense
+        start.append(lambda unit, friends: setattr(unit, "ignore_def", chance))
+    if eff.get("first_strike_bonus"):
+        bonus = 1 + eff["first_strike_bonus"]
+        def first_strike(user, target, dmg, crit):
+            return int(dmg * bonus) if not user.has_struck else dmg
+        mods.append(first_strike)
+    if eff.get("bonus_crit_dmg_vs_fighter"):
+        bonus = 1 + eff["bonus_crit_dmg_vs_fighter"]
+        def vs_fighter(user, target, dmg, crit):
+            return int(dmg * bonus) if crit and target.cls == "Fighter" else dmg
+        mods.append(vs_fighter)
+    if eff.get("hp_threshold"):
+        threshold, bonus = eff["hp_threshold"], 1 + eff.get("bonus_damage", 0.0)
+        def low_hp(user, target, dmg, crit):
+            return int(dmg * bonus) if user.hp < threshold * user.max_hp else dmg
+        mods.append(low_hp)
+    return start, mods, regen
+
+def _scale(unit, stat, factor):
+    setattr(unit, stat, int(getattr(unit, stat) * factor))
@@ -0,0 +1,285 @@
+# snapshot.py
+"""
+Versioned binary snapshot of a JSON-like save.
+
+Layout (all little-endian; big-endian machines byteswap columns on save and load):
+  header   MAGIC, version (u16), section count (u16), byte order (u32, LITTLE_ENDIAN)
+  table    (offset u64, item count u64) per section
+  sections 8-byte aligned columns, see SECTIONS
+
+The document is flattened into nodes in pre-order. Every node has a kind, a ref into the
+column for its kind and the string id of its dict key. Numbers live in the int64/float64
+columns, strings (values and keys) in one interned string table, so repeated skill names and
+descriptions are stored once. load() maps the file and reads columns in place (on a
+big-endian machine it reads byteswapped copies instead).
+"""
+import json, mmap, struct, sys
+from array import array
+
+MAGIC = b"WKSNAP\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+SECTION = struct.Struct("<QQ")
+LITTLE_ENDIAN = 0  # byte order field of the header; no other order is written
+_SWAP = sys.byteorder != "little"
+
+# (name, array typecode)
+SECTIONS = (
+    ("kind", "B"),
+    ("ref", "I"),
+    ("key", "I"),
+    ("ints", "q"),
+    ("floats", "d"),
+    ("count", "I"),        # children per container
+    ("size", "I"),         # descendant nodes per container (to skip subtrees)
+    ("str_offsets", "Q"),  # n_strings + 1 offsets into str_blob
+    ("str_blob", "B"),
+)
+
+# node kinds
+NULL, FALSE, TRUE, INT, FLOAT, STR, BIGINT, LIST, DICT = range(9)
+NO_KEY = 0xFFFFFFFF
+
+class _Builder:
+    def __init__(self):
+        self.cols = {name: array(code) for name, code in SECTIONS}
+        self.strings = {}
+        self.blob = bytearray()
+        self.cols["str_offsets"].append(0)
+
+    def intern(self, s):
+        sid = self.strings.get(s)
+        if sid is None:
+            sid = self.strings[s] = len(self.strings)
+            self.blob += s.encode("utf-8")
+            self.cols["str_offsets"].append(len(self.blob))
+        return sid
+
+    def add(self, value, key=NO_KEY):
+        c = self.cols
+        node = len(c["kind"])
+        c["key"].append(key)
+        if value is None:
+            c["kind"].append(NULL); c["ref"].append(0)
+        elif value is True or value is False:
+            c["kind"].append(TRUE if value else FALSE); c["ref"].append(0)
+        elif isinstance(value, int):
+            if -2**63 <= value < 2**63:
+                c["kind"].append(INT); c["ref"].append(len(c["ints"])); c["ints"].append(value)
+            else:
+                c["kind"].append(BIGINT); c["ref"].append(self.intern(str(value)))
+        elif isinstance(value, float):
+            c["kind"].append(FLOAT); c["ref"].append(len(c["floats"])); c["floats"].append(value)
+        elif isinstance(value, str):
+            c["kind"].append(STR); c["ref"].append(self.intern(value))
+        elif isinstance(value, (list, tuple, dict)):
+            is_dict = isinstance(value, dict)
+            cont = len(c["count"])
+            c["kind"].append(DICT if is_dict else LIST); c["ref"].append(cont)
+            c["count"].append(len(value)); c["size"].append(0)
+            if is_dict:
+                for k, v in value.items():
+                    self.add(v, self.intern(str(k)))
+            else:
+                for v in value:
+                    self.add(v)
+            c["size"][cont] = len(c["kind"]) - node - 1
+        else:
+            raise TypeError(f"Cannot snapshot {type(value).__name__}")
+
+    def tobytes(self):
+        self.cols["str_blob"] = array("B", self.blob)
+        out = bytearray(HEADER.pack(MAGIC, VERSION, len(SECTIONS), LITTLE_ENDIAN))
+        table_at = len(out)
+        out += bytes(SECTION.size * len(SECTIONS))
+        for i, (name, _) in enumerate(SECTIONS):
+            col = self.cols[name]
+            if _SWAP and col.itemsize > 1:
+                col = array(col.typecode, col)
+                col.byteswap()
+            out += bytes(-len(out) % 8)
+            SECTION.pack_into(out, table_at + i * SECTION.size, len(out), len(col))
+            out += col.tobytes()
+        return bytes(out)
+
+def dumps(obj):
+    """Encodes a JSON-compatible object as snapshot bytes."""
+    b = _Builder()
+    b.add(obj)
+    return b.tobytes()
+
+def save(obj, filename):
+    from save_load import atomic_write  # save_load imports this module
+    atomic_write(filename, dumps(obj))
+
+class Snapshot:
+    """
+    Read-only view over snapshot bytes (usually an mmap). Numeric columns are memoryviews
+    into the buffer, e.g. snap.column("ints"); nothing is decoded until asked for.
+    """
+    def __init__(self, buf, _mmap=None):
+        self._mmap = _mmap
+        self._buf = memoryview(buf)
+        magic, version, n_sections, byte_order = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a snapshot file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        if byte_order != LITTLE_ENDIAN:
+            raise ValueError(f"Unsupported snapshot byte order {byte_order}")
+        self.version = version
+        self._cols = {}
+        for i, (name, code) in enumerate(SECTIONS[:n_sections]):
+            offset, n = SECTION.unpack_from(self._buf, HEADER.size + i * SECTION.size)
+            size = array(code).itemsize
+            col = self._buf[offset:offset + n * size]
+            if _SWAP and size > 1:
+                swapped = array(code)
+                swapped.frombytes(col)
+                swapped.byteswap()
+                col.release()
+                self._cols[name] = memoryview(swapped)
+            else:
+                self._cols[name] = col.cast(code)
+        self._strs = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for col in self._cols.values():
+            col.release()
+        self._buf.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def column(self, name):
+        return self._cols[name]
+
+    def string(self, sid):
+        s = self._strs.get(sid)
+        if s is None:
+            off = self._cols["str_offsets"]
+            s = self._strs[sid] = bytes(self._cols["str_blob"][off[sid]:off[sid + 1]]).decode("utf-8")
+        return s
+
+    def children(self, node):
+        """Yields (key or index, child node) of a container node."""
+        kind, cont = self._cols["kind"][node], self._cols["ref"][node]
+        child = node + 1
+        for i in range(self._cols["count"][cont]):
+            yield (self.string(self._cols["key"][child]) if kind == DICT else i), child
+            if self._cols["kind"][child] in (LIST, DICT):
+                child += self._cols["size"][self._cols["ref"][child]]
+            child += 1
+
+    def find(self, *path, node=0):
+        """Node at a path of dict keys / list indexes, without decoding anything else."""
+        for step in path:
+            for k, child in self.children(node):
+                if k == step:
+                    node = child
+                    break
+            else:
+                raise KeyError(step)
+        return node
+
+    def get(self, *path):
+        return self.value(self.find(*path))
+
+    def value(self, node=0):
+        """Decodes a node (default: the whole document) into Python objects."""
+        kind, ref = self._cols["kind"][node], self._cols["ref"][node]
+        if kind == INT:
+            return self._cols["ints"][ref]
+        if kind == FLOAT:
+            return self._cols["floats"][ref]
+        if kind == STR:
+            return self.string(ref)
+        if kind == BIGINT:
+            return int(self.string(ref))
+        if kind not in (LIST, DICT):
+            return (None, False, True)[kind]
+
+        # containers: bulk-convert the subtree's slice of each column once, per-item memoryview
+        # reads are slow for big subtrees. Its nodes are node..end; the numbers and containers
+        # they refer to were appended in pre-order too, so each is one contiguous run.
+        end = node + 1 + self._cols["size"][ref]
+        kinds = self._cols["kind"][node:end].tolist()
+        refs = self._cols["ref"][node:end].tolist()
+        keys = self._cols["key"][node:end].tolist()
+        int_lo, ints = self._run(kinds, refs, (INT,), "ints")
+        float_lo, floats = self._run(kinds, refs, (FLOAT,), "floats")
+        cont_lo, counts = self._run(kinds, refs, (LIST, DICT), "count")
+        string = self.string  # decoded on demand, cached per id
+        pos = 0
+
+        def decode():
+            nonlocal pos
+            kind, ref = kinds[pos], refs[pos]
+            pos += 1
+            if kind == INT:
+                return ints[ref - int_lo]
+            if kind == FLOAT:
+                return floats[ref - float_lo]
+            if kind == STR:
+                return string(ref)
+            if kind == DICT:
+                d = {}
+                for _ in range(counts[ref - cont_lo]):
+                    k = string(keys[pos])
+                    d[k] = decode()
+                return d
+            if kind == LIST:
+                return [decode() for _ in range(counts[ref - cont_lo])]
+            if kind == BIGINT:
+                return int(string(ref))
+            return (None, False, True)[kind]
+
+        return decode()
+
+    def _run(self, kinds, refs, of_kinds, name):
+        """(first ref, values) of the entries of column `name` used by the nodes of these kinds."""
+        n = sum(kinds.count(k) for k in of_kinds)
+        if not n:
+            return 0, []
+        lo = refs[min(kinds.index(k) for k in of_kinds if k in kinds)]
+        return lo, self._cols[name][lo:lo + n].tolist()
+
+def loads(data):
+    with Snapshot(data) as snap:
+        return snap.value()
+
+def load(filename):
+    """Maps a snapshot file; the caller should close() the returned Snapshot."""
+    with open(filename, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return Snapshot(mm, mm)
+
+def is_snapshot(filename):
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+def json_to_snapshot(json_file, snap_file):
+    with open(json_file, "r") as f:
+        save(json.load(f), snap_file)
+
+def snapshot_to_json(snap_file, json_file, indent=4):
+    with load(snap_file) as snap:
+        data = snap.value()
+    with open(json_file, "w") as f:
+        json.dump(data, f, indent=indent)
+
+if __name__ == "__main__":
+    # python snapshot.py savegame.json savegame.snap  (or the other way round)
+    src, dst = sys.argv[1:3]
+    if is_snapshot(src):
+        snapshot_to_json(src, dst)
+    else:
+        json_to_snapshot(src, dst)
@@ -0,0 +1,109 @@
+# status.py
+"""
+Buffs and debuffs for skill battles as per-stat aggregates.
+
+Each unit keeps, per stat it has statuses on, the stat's base value, the sum of flat
+amounts and the product of percent factors, and its stat attribute always holds
+(base + sum) * product. Applying or expiring a status updates the aggregate and that one
+attribute, so the damage path reads plain attributes and never walks a buff list.
+Expirations sit in a timer wheel indexed by turn: end of turn T only touches the
+statuses ending at T.
+"""
+
+WHEEL_SIZE = 16  # turns covered by the wheel; longer statuses wait for another lap
+
+class Status:
+    __slots__ = ("unit", "key", "stat", "add", "factor", "last_turn")
+
+    def __init__(self, unit, key, stat, add, factor, last_turn):
+        self.unit = unit
+        self.key = key
+        self.stat = stat
+        self.add = add
+        self.factor = factor
+        self.last_turn = last_turn
+
+class StatAggregates:
+    """A unit's statuses: {key: Status} and per stat base, sum, product (zero factors counted apart), count."""
+    __slots__ = ("active", "base", "add", "mul", "zeros", "count")
+
+    def __init__(self):
+        self.active = {}
+        self.base = {}
+        self.add = {}
+        self.mul = {}
+        self.zeros = {}
+        self.count = {}
+
+    def value(self, stat):
+        if self.zeros[stat]:
+            return 0
+        return (self.base[stat] + self.add[stat]) * self.mul[stat]
+
+class StatusBoard:
+    """Statuses of every unit in one battle, with the timer wheel of their expirations."""
+
+    def __init__(self):
+        self.wheel = [[] for _ in range(WHEEL_SIZE)]
+
+    def apply(self, unit, key, stat, amount, is_percent, last_turn):
+        """
+        Adds a status (key: skill and kind) lasting through last_turn; amount is signed,
+        a fraction if is_percent. The same key again only extends its duration.
+        Returns True if unit's stat changed.
+        """
+        agg = unit.buffs
+        if agg is None:
+            agg = unit.buffs = StatAggregates()
+        status = agg.active.get(key)
+        if status is not None:
+            # re-filed by expire() when its old slot comes up
+            status.last_turn = max(status.last_turn, last_turn)
+            return False
+        if stat not in agg.base:
+            agg.base[stat] = getattr(unit, stat)
+            agg.add[stat] = 0
+            agg.mul[stat] = 1.0
+            agg.zeros[stat] = 0
+            agg.count[stat] = 0
+        add, factor = (0, 1 + amount) if is_percent else (amount, 1.0)
+        status = agg.active[key] = Status(unit, key, stat, add, factor, last_turn)
+        agg.count[stat] += 1
+        agg.add[stat] += add
+        if factor:
+            agg.mul[stat] *= factor
+        else:
+            agg.zeros[stat] += 1
+        setattr(unit, stat, agg.value(stat))
+        self.wheel[last_turn % WHEEL_SIZE].append(status)
+        return True
+
+    def expire(self, turn):
+        """Removes the statuses ending this turn; returns them (their units' stats are restored)."""
+        slot = turn % WHEEL_SIZE
+        due = self.wheel[slot]
+        if not due:
+            return due
+        self.wheel[slot] = []
+        expired = []
+        for status in due:
+            if status.last_turn > turn:
+                self.wheel[status.last_turn % WHEEL_SIZE].append(status)
+                continue
+            unit, stat = status.unit, status.stat
+            agg = unit.buffs
+            del agg.active[status.key]
+            agg.count[stat] -= 1
+            agg.add[stat] -= status.add
+            if status.factor:
+                agg.mul[stat] /= status.factor
+            else:
+                agg.zeros[stat] -= 1
+            if not agg.count[stat]:
+                # no status left on it: back to the exact base value
+                setattr(unit, stat, agg.base.pop(stat))
+                del agg.add[stat], agg.mul[stat], agg.zeros[stat], agg.count[stat]
+            else:
+                setattr(unit, stat, agg.value(stat))
+            expired.append(status)
+        return expired
@@ -0,0 +1,132 @@
+# sweep.py
+import argparse, json, math, os, sys, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from itertools import combinations, permutations
+from battle import battle
+from campaign import generate_enemy_team
+from roster import Roster
+from save_load import load_templates
+from seeding import derive_seed, battle_seeds
+from battle_cache import BattleCache
+
+# Per-worker state, filled once by _init_worker
+_heroes = []
+_enemy_templates = []
+_cache = None
+
+# tasks in flight per worker: keeps every core busy without a future per task up front
+WINDOW_PER_WORKER = 4
+
+def load_heroes(roster_file, hero_file):
+    """Heroes from a saved roster if present, else one of each template."""
+    roster = Roster()
+    if roster_file and os.path.exists(roster_file):
+        roster.load_from_file(roster_file)
+    if not roster.heroes:
+        for h in load_templates(hero_file):
+            roster.add_from_template(h)
+    return roster.heroes
+
+def _init_worker(roster_file, hero_file, enemy_file, cache_dir=None):
+    global _heroes, _enemy_templates, _cache
+    _heroes = load_heroes(roster_file, hero_file)
+    _enemy_templates = load_templates(enemy_file)
+    _cache = BattleCache(disk_dir=cache_dir) if cache_dir else None
+
+def run_task(stage, team, n, seed, engine="python"):
+    """Fights n battles of the given team (hero indices) at one stage."""
+    # sub-seeds depend only on the task, not on which worker picks it up, so reruns are reproducible
+    task_seed = derive_seed(seed, stage, tuple(team))
+    chars = [_heroes[i] for i in team]
+    if engine == "numpy":
+        # the task's battles in one batch, with one crit stream for all of them (see battle_np)
+        from battle_np import battles_numpy
+        teams = [generate_enemy_team(stage, _enemy_templates, characters=False, rng=battle_seeds(task_seed, i)[0])
+                 for i in range(n)]
+        wins = sum(r["player_win"] for r in battles_numpy(chars, teams, rng=task_seed))
+        return {"stage": stage, "team": list(team), "battles": n, "wins": wins}
+    wins = 0
+    for i in range(n):
+        enemy_seed, crit_seed = battle_seeds(task_seed, i)
+        enemies = generate_enemy_team(stage, _enemy_templates, characters=False, rng=enemy_seed)
+        if _cache:
+            result = _cache.battle(chars, enemies, crit_seed, log_level="none")
+        else:
+            result = battle(chars, enemies, log_level="none", rng=crit_seed)
+        wins += result["player_win"]
+    return {"stage": stage, "team": list(team), "battles": n, "wins": wins}
+
+def team_configs(n_heroes, team_size, ordered=False):
+    """
+    Every team of team_size heroes, generated lazily; ordered=True also varies position
+    (targeting order). count_teams gives how many there are.
+    """
+    pick = permutations if ordered else combinations
+    return pick(range(n_heroes), team_size)
+
+def count_teams(n_heroes, team_size, ordered=False):
+    """Number of teams team_configs yields."""
+    return math.perm(n_heroes, team_size) if ordered else math.comb(n_heroes, team_size)
+
+def sweep(stages, teams, n, seed=0, workers=None, engine="python",
+          roster_file="roster_save.dat", hero_file="data/heroes.json", enemy_file="data/enemies.json",
+          cache_dir=None):
+    """
+    Spreads (stage, team) tasks over a process pool.
+    Yields each task's result as soon as it completes (unordered).
+    stages: a sequence (read once per team); teams: any iterable, e.g. team_configs(), read
+            as tasks are submitted, with at most WINDOW_PER_WORKER tasks per worker in flight
+    cache_dir: share battle results between runs through a battle_cache.BattleCache disk tier
+    """
+    window = WINDOW_PER_WORKER * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(roster_file, hero_file, enemy_file, cache_dir)) as pool:
+        pending = set()
+        for team in teams:
+            for stage in stages:
+                pending.add(pool.submit(run_task, stage, team, n, seed, engine))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        yield fut.result()
+        for fut in as_completed(pending):
+            yield fut.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run campaign battles for a range of stages and teams on all cores.")
+    parser.add_argument("--start", type=int, default=1, help="first stage")
+    parser.add_argument("--end", type=int, default=500, help="last stage (inclusive)")
+    parser.add_argument("--team-size", type=int, default=5)
+    parser.add_argument("--ordered", action="store_true", help="try every permutation instead of every combination")
+    parser.add_argument("-n", "--battles", type=int, default=20, help="battles per stage and team")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    parser.add_argument("--engine", default="python", choices=("python", "numpy"))
+    parser.add_argument("--roster", default="roster_save.dat")
+    parser.add_argument("--heroes", default="data/heroes.json")
+    parser.add_argument("--enemies", default="data/enemies.json")
+    parser.add_argument("--cache", default=None, help="directory for cached battle results, reused across runs")
+    parser.add_argument("-o", "--out", default=None, help="write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    n_heroes = len(load_heroes(args.roster, args.heroes))
+    team_size = min(args.team_size, n_heroes)
+    teams = team_configs(n_heroes, team_size, args.ordered)
+    stages = range(args.start, args.end + 1)
+    total = len(stages) * count_teams(n_heroes, team_size, args.ordered)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    started = time.time()
+    try:
+        for done, result in enumerate(sweep(stages, teams, args.battles, args.seed, args.workers, args.engine,
+                                            args.roster, args.heroes, args.enemies, args.cache), 1):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            print(f"\r{done}/{total} tasks, {time.time() - started:.1f}s", end="", file=sys.stderr, flush=True)
+        print(file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
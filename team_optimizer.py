@@ -0,0 +1,155 @@
+# team_optimizer.py
+"""
+Best teams for a stage: ranks team compositions from a roster against the stage's enemy
+distribution (generate_enemy_team picks the 5 enemies uniformly from the templates).
+
+Brute force is out of reach (C(500, 5) is 2.5e11 teams), so the search narrows down:
+  1. every hero gets expected damage and survivability numbers against the stage's
+     templates; identical heroes are merged and only the best few by each measure are kept
+  2. every team from that pool is scored analytically (team damage x team effective HP,
+     Lanchester style) and the best go through idle.expected_battle
+  3. the leaders are confirmed with seeded skill battles, as the game fights them, until
+     the time budget runs out, checked every CHUNK battles (plain battles batched through
+     simulate.simulate_many with skills=False)
+
+Steps 1 and 2 only see plain attacks: skills and passives aren't modeled, so a hero who
+wins with skills rather than raw stats can be pruned before step 3. Only win_rate reflects
+skills; raise POOL_PER_MEASURE and CANDIDATES to look further.
+
+    python team_optimizer.py --stage 40 --top 5
+"""
+import argparse, heapq, json, sys
+from itertools import combinations
+from time import perf_counter
+from battle import BattleUnit
+from campaign import enemy_unit
+from idle import expected_hit, expected_battle, win_chance
+from seeding import derive_seed
+
+POOL_PER_MEASURE = 8   # heroes kept by damage, by survivability and by both
+CANDIDATES = 60        # teams from the analytic score checked with expected_battle
+SAMPLES = 200          # simulated battles per confirmed team
+CHUNK = 25             # battles between checks of the time budget
+
+class HeroScore:
+    __slots__ = ("hero", "unit", "damage", "ehp")
+
+    def __init__(self, hero, enemies):
+        self.hero = hero
+        self.unit = u = BattleUnit(hero)
+        # mean over the templates: each enemy slot is a uniform pick
+        self.damage = sum(expected_hit(u, e) for e in enemies) / len(enemies)
+        incoming = sum(expected_hit(e, u) for e in enemies) / len(enemies)
+        self.ehp = u.hp / max(incoming, 1.0)
+
+def hero_pool(heroes, enemies, per_measure=POOL_PER_MEASURE):
+    """The heroes worth combining: best by damage, by effective HP and by their product."""
+    seen = {}
+    for h in heroes:
+        # copies of the same hero fight the same way, keep one of each
+        key = (h.id, h.level, h.stars, h.awakened)
+        if key not in seen:
+            seen[key] = HeroScore(h, enemies)
+    scores = list(seen.values())
+    pool = {}
+    for measure in (lambda s: s.damage, lambda s: s.ehp, lambda s: s.damage * s.ehp):
+        for s in sorted(scores, key=measure, reverse=True)[:per_measure]:
+            pool[id(s)] = s
+    return list(pool.values())
+
+def arrange(team):
+    """Battle order for a team: enemies hit the first alive hero, so the sturdiest go in front."""
+    return sorted(team, key=lambda s: s.ehp, reverse=True)
+
+def best_teams(heroes, enemy_templates, stage, size=5, top=10, budget=2.0, samples=SAMPLES,
+               seed=0, max_turns=60, skills=True):
+    """
+    Ranked teams of `size` heroes for a stage, best first, found within about `budget` seconds.
+    Returns a list of dicts: team (heroes in battle order), score (analytic, higher is
+    better), margin (expected_battle: share of HP left, negative for a loss), win_rate
+    and battles (win_rate is over that many seeded battles, up to `samples`: fewer when
+    the budget ran out during that team, None and 0 when it ran out before).
+    Every team is simulated against the same enemy draws and crit rolls (seed).
+    skills: confirm with skill battles (battle(..., skills=True)); False for plain battles
+    through simulate_many. score and margin are plain-rule estimates either way.
+    """
+    deadline = perf_counter() + budget
+    enemies = [BattleUnit(enemy_unit(t, stage)) for t in enemy_templates]
+    pool = hero_pool(heroes, enemies)
+    size = min(size, len(pool))
+
+    # analytic pass over every team of the pool
+    team_score = lambda team: sum(s.damage for s in team) * sum(s.ehp for s in team)
+    candidates = []
+    for team in heapq.nlargest(max(CANDIDATES, top), combinations(pool, size), key=team_score):
+        score = team_score(team)
+        team = arrange(team)
+        units = [s.unit for s in team]
+        # against a full lineup of each template, as idle.stage_outcome checks a stage
+        margin = 0.0
+        for e in enemies:
+            win, _, m = expected_battle(units, [e] * 5, max_turns)
+            margin += m if win else -m - 1.0
+        candidates.append({"team": [s.hero for s in team], "score": score,
+                           "margin": margin / len(enemies), "win_rate": None, "battles": 0})
+    candidates.sort(key=lambda c: (c["margin"], c["score"]), reverse=True)
+
+    for c in candidates[:top]:
+        if perf_counter() >= deadline:
+            break
+        c["win_rate"], c["battles"] = win_rate(c["team"], enemy_templates, stage, samples, seed, max_turns,
+                                               skills, deadline)
+
+    ranked = sorted(candidates[:top], key=lambda c: (c["win_rate"] is not None, c["win_rate"] or 0.0,
+                                                     c["margin"], c["score"]), reverse=True)
+    return ranked
+
+def win_rate(team, enemy_templates, stage, samples, seed, max_turns=60, skills=True, deadline=None):
+    """
+    Seeded win rate over up to `samples` battles: (rate, battles fought), rate None if none were.
+    Plain battles go in one simulate_many call where they can; otherwise battles are fought
+    CHUNK at a time and stop at the first chunk that starts past deadline (a perf_counter time).
+    """
+    if not skills:
+        try:
+            from simulate import simulate_many
+            return simulate_many(team, enemy_templates, stage, samples, max_turns, rng=seed)["win_rate"], samples
+        except (ImportError, ValueError):
+            pass  # no numpy, or stats past float64 precision
+    wins = fought = 0
+    while fought < samples and (deadline is None or perf_counter() < deadline):
+        n = min(CHUNK, samples - fought)
+        # chunks have their own seeds, so every team meets the same enemies and rolls
+        rate = win_chance(team, enemy_templates, stage, max_turns, samples=n,
+                          seed=derive_seed(seed, fought // CHUNK), skills=skills)
+        wins += round(rate * n)
+        fought += n
+    return (wins / fought if fought else None), fought
+
+def main(argv=None):
+    from save_load import load_templates
+    from sweep import load_heroes
+    parser = argparse.ArgumentParser(description="Rank the best teams from a roster for a stage.")
+    parser.add_argument("--stage", type=int, required=True)
+    parser.add_argument("--team-size", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds to spend")
+    parser.add_argument("-n", "--samples", type=int, default=SAMPLES, help="battles per confirmed team")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plain", action="store_true", help="confirm with plain battles instead of skill battles")
+    parser.add_argument("--roster", default="roster_save.dat")
+    parser.add_argument("--heroes", default="data/heroes.json")
+    parser.add_argument("--enemies", default="data/enemies.json")
+    args = parser.parse_args(argv)
+
+    heroes = load_heroes(args.roster, args.heroes)
+    started = perf_counter()
+    ranked = best_teams(heroes, load_templates(args.enemies), args.stage, args.team_size, args.top,
+                        args.budget, args.samples, args.seed, skills=not args.plain)
+    for c in ranked:
+        print(json.dumps({"team": [h.name for h in c["team"]], "win_rate": c["win_rate"], "battles": c["battles"],
+                          "margin": round(c["margin"], 4), "score": round(c["score"], 1)}))
+    print(f"{len(heroes)} heroes, {perf_counter() - started:.2f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
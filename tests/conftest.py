@@ -0,0 +1,24 @@
+# tests/conftest.py
+"""
+Behavior tests (plain pytest, run from the repo root):
+
+    python -m pytest tests
+"""
+import os, sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from save_load import load_templates
+
+def data_file(name):
+    return os.path.join(ROOT, "data", name)
+
+@pytest.fixture(scope="session")
+def hero_templates():
+    return load_templates(data_file("heroes.json"))
+
+@pytest.fixture(scope="session")
+def enemy_templates():
+    return load_templates(data_file("enemies.json"))
@@ -0,0 +1,41 @@
+# tests/test_battle.py
+import copy
+import pytest
+from battle import battle
+from campaign import generate_enemy_team
+from roster import Roster
+
+@pytest.fixture
+def roster(hero_templates):
+    roster = Roster()
+    for t in hero_templates[:5]:
+        roster.add_from_template(t)
+    return roster
+
+def state(team):
+    return [(c.to_dict(), dict(c.current_stats)) if hasattr(c, "to_dict") else copy.deepcopy(c) for c in team]
+
+@pytest.mark.parametrize("skills", (False, True))
+@pytest.mark.parametrize("characters", (False, True))
+def test_battle_leaves_units_alone(roster, enemy_templates, monkeypatch, skills, characters):
+    team = roster.get_team(5)
+    enemies = generate_enemy_team(30, enemy_templates, characters=characters, rng=4)
+    before = state(team), state(enemies)
+    # battle units are views over the templates, nothing gets deep-copied on the way in
+    monkeypatch.setattr(copy, "deepcopy", lambda *a: pytest.fail("deepcopy in battle"))
+    result = battle(team, enemies, rng=9, skills=skills)
+    monkeypatch.undo()
+    assert (state(team), state(enemies)) == before
+    # the same inputs fight the same battle again
+    again = battle(team, enemies, rng=9, skills=skills)
+    assert (again["player_win"], again["turns"]) == (result["player_win"], result["turns"])
+    assert again["log"].rounds() == result["log"].rounds()
+
+def test_plain_rules():
+    ally = {"name": "A", "stats": {"hp": 1000, "attack": 500, "defense": 0, "crit_rate": 0, "crit_dmg": 2}}
+    enemy = {"name": "X", "stats": {"hp": 900, "attack": 1100, "defense": 1000, "crit_rate": 1, "crit_dmg": 2}}
+    # A hits for int(500 * (1 - 1000/2000)) = 250, X crits back for int(1100) * 2
+    result = battle([ally], [enemy], rng=1)
+    assert not result["player_win"] and result["turns"] == 1
+    assert result["log"].rounds() == [["A hits X for 250.", "X hits A for 2200."]]
+    assert battle([ally], [dict(enemy, stats=dict(enemy["stats"], attack=1))], max_turns=3)["title"] == "Timed out"
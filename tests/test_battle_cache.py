@@ -0,0 +1,77 @@
+# tests/test_battle_cache.py
+import random
+import pytest
+from battle import battle
+from battle_cache import BattleCache, battle_key
+from campaign import generate_enemy_team
+from roster import Roster
+
+@pytest.fixture(scope="module")
+def team(hero_templates):
+    roster = Roster()
+    for t in hero_templates[:5]:
+        roster.add_from_template(t)
+    return roster.get_team(5)
+
+@pytest.fixture(scope="module")
+def enemies(enemy_templates):
+    return generate_enemy_team(35, enemy_templates, characters=False, rng=2)
+
+def outcome(result):
+    return result["player_win"], result["title"], result["turns"]
+
+@pytest.mark.parametrize("skills", (False, True))
+def test_hit_and_miss(team, enemies, skills):
+    cache = BattleCache()
+    first = cache.battle(team, enemies, 5, skills=skills)
+    again = cache.battle(team, enemies, 5, skills=skills)
+    assert (cache.misses, cache.hits) == (1, 1)
+    expected = battle(team, enemies, rng=5, skills=skills)
+    assert outcome(first) == outcome(again) == outcome(expected)
+    assert again["log"].rounds() == expected["log"].rounds()
+    cache.battle(team, enemies, 6, skills=skills)
+    assert cache.misses == 2
+
+def test_key_follows_the_units(team, enemies):
+    key = battle_key(team, enemies, 1)
+    assert battle_key(list(team), list(enemies), 1) == key
+    assert battle_key(team, enemies, 2) != key
+    assert battle_key(team, enemies, 1, skills=True) != key
+    assert battle_key(team, enemies, 1, max_turns=30) != key
+    stronger = [dict(enemies[0], stats=dict(enemies[0]["stats"], attack=enemies[0]["stats"]["attack"] + 1))]
+    assert battle_key(team, stronger + enemies[1:], 1) != key
+
+def test_log_levels(team, enemies):
+    cache = BattleCache()
+    assert cache.battle(team, enemies, 5, log_level="none")["log"] is None
+    # a result stored without a log is fought again when the log is asked for
+    full = cache.battle(team, enemies, 5)
+    assert cache.misses == 2 and full["log"].rounds() == battle(team, enemies, rng=5)["log"].rounds()
+    assert cache.battle(team, enemies, 5, log_level="none")["log"] is None and cache.hits == 1
+
+def test_unseeded_calls_bypass_the_cache(team, enemies):
+    cache = BattleCache()
+    cache.battle(team, enemies, None)
+    cache.battle(team, enemies, random.Random(3))
+    assert (cache.hits, cache.misses, len(cache._mem)) == (0, 0, 0)
+
+def test_memory_tier_is_bounded(team, enemies):
+    cache = BattleCache(max_entries=3)
+    for seed in range(5):
+        cache.battle(team, enemies, seed, log_level="none")
+    assert len(cache._mem) == 3
+    cache.battle(team, enemies, 0, log_level="none")
+    assert cache.misses == 6
+
+def test_disk_tier(tmp_path, team, enemies):
+    writer = BattleCache(disk_dir=str(tmp_path))
+    stored = writer.battle(team, enemies, 9)
+    # another process: empty memory, same directory
+    reader = BattleCache(disk_dir=str(tmp_path))
+    loaded = reader.battle(team, enemies, 9)
+    assert (reader.disk_hits, reader.misses) == (1, 0)
+    assert outcome(loaded) == outcome(stored)
+    assert loaded["log"].rounds() == stored["log"].rounds()
+    reader.battle(team, enemies, 9)
+    assert reader.hits == 1
+    assert not list(tmp_path.rglob("*.tmp"))
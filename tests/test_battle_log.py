@@ -0,0 +1,48 @@
+# tests/test_battle_log.py
+import pytest
+from battle import battle
+from battle_log import BattleLog, LOG_FULL, HIT, HEAL, entry_rounds
+
+def unit(name, hp=1000, attack=300, defense=50, crit_rate=0.3):
+    return {"name": name, "stats": {"hp": hp, "attack": attack, "defense": defense,
+                                    "crit_rate": crit_rate, "crit_dmg": 1.5}}
+
+@pytest.fixture
+def teams():
+    return [unit("A"), unit("B", attack=200)], [unit("X"), unit("Y"), unit("Z", hp=3000)]
+
+def test_levels_agree(teams):
+    full = battle(*teams, log_level="full", rng=3)
+    summary = battle(*teams, log_level="summary", rng=3)
+    none = battle(*teams, log_level="none", rng=3)
+    assert full["turns"] == summary["turns"] == none["turns"]
+    assert none["log"] is None and entry_rounds(none) == []
+    # the summary keeps per-unit damage only, the same totals as the full log
+    assert summary["log"].dealt == full["log"].dealt
+    assert summary["log"].n_events == 0
+    assert sum(ev[3] for ev in full["log"].iter_events()) == sum(full["log"].dealt)
+
+def test_rounds_text(teams):
+    log = battle(*teams, rng=3)["log"]
+    rounds = log.rounds()
+    assert len(rounds) == log.turns
+    assert rounds[0][0].startswith("A hits X for ")
+    assert sum(map(len, rounds)) == log.n_events
+    assert all(log.round_lines(t) == rounds[t - 1] for t in range(1, log.turns + 1))
+    assert log.rounds() is rounds
+
+def test_dumps_roundtrip(teams):
+    log = battle(*teams, rng=3)["log"]
+    log.trim()
+    back = BattleLog.loads(log.dumps())
+    assert back.rounds() == log.rounds()
+    assert back.dealt == log.dealt
+
+def test_skill_events_and_huge_values():
+    log = BattleLog(["A", "X"], 2)
+    log.event(1, 0, 1, 2**70, HIT, "Smite", crit=True)  # past int64: falls back to a list
+    log.event(1, 0, 0, 30, HEAL, "Mend")
+    log.turns = 1
+    assert log.rounds() == [[f"A uses Smite on X for {2**70}. Critical!", "A's Mend heals A for 30."]]
+    assert BattleLog.loads(log.dumps()).rounds() == log.rounds()
+    assert log.dealt == [2**70, 0]
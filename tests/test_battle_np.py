@@ -0,0 +1,49 @@
+# tests/test_battle_np.py
+import pytest
+np = pytest.importorskip("numpy")
+
+from battle import battle
+from battle_np import battles_numpy
+from campaign import generate_enemy_team
+from roster import Roster
+
+def fixed_crits(team, crit_rate):
+    """Unit dicts of a team with every crit roll decided in advance (0: never, 1: always)."""
+    out = []
+    for ch in team:
+        stats = dict(ch.current_stats if hasattr(ch, "current_stats") else ch["stats"], crit_rate=crit_rate)
+        out.append({"name": ch.name if hasattr(ch, "name") else ch["name"], "stats": stats})
+    return out
+
+@pytest.fixture(scope="module")
+def team(hero_templates):
+    roster = Roster()
+    for t in hero_templates[:5]:
+        roster.add_from_template(t)
+    return roster.get_team(5)
+
+@pytest.mark.parametrize("crit_rate", (0.0, 1.0))
+@pytest.mark.parametrize("stage", (1, 10, 40, 100, 600, 2000))
+def test_batch_matches_python_engine(team, enemy_templates, stage, crit_rate):
+    # with no crit rolls left to chance both engines fight every battle the same way;
+    # stage 2000 is past float64 precision and goes through battle() inside the batch
+    allies = fixed_crits(team, crit_rate)
+    teams = [fixed_crits(generate_enemy_team(stage, enemy_templates, characters=False, rng=i), crit_rate)
+             for i in range(40)]
+    expected = [battle(allies, enemies, log_level="none") for enemies in teams]
+    got = battles_numpy(allies, teams)
+    key = lambda r: (r["player_win"], r["turns"], r["title"])
+    assert list(map(key, got)) == list(map(key, expected))
+
+def test_batch_pads_smaller_enemy_teams(team, enemy_templates):
+    allies = fixed_crits(team, 0.0)
+    full = fixed_crits(generate_enemy_team(20, enemy_templates, characters=False, rng=1), 0.0)
+    teams = [full, full[:2], full[:1]]
+    got = battles_numpy(allies, teams)
+    assert [r["turns"] for r in got] == [battle(allies, e, log_level="none")["turns"] for e in teams]
+
+def test_batch_is_reproducible_for_a_seed(team, enemy_templates):
+    teams = [generate_enemy_team(30, enemy_templates, characters=False, rng=i) for i in range(20)]
+    key = lambda rs: [(r["player_win"], r["turns"]) for r in rs]
+    assert key(battles_numpy(team, teams, rng=7)) == key(battles_numpy(team, teams, rng=7))
+    assert battles_numpy(team, [], rng=7) == []
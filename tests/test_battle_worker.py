@@ -0,0 +1,41 @@
+# tests/test_battle_worker.py
+import pytest
+from battle import battle
+from battle_worker import BattleWorker, ROUND, DONE, FAILED
+from campaign import generate_enemy_team
+from roster import Roster
+
+@pytest.fixture(scope="module")
+def team(hero_templates):
+    roster = Roster()
+    for t in hero_templates[:5]:
+        roster.add_from_template(t)
+    return roster.get_team(5)
+
+def test_rounds_then_result_in_submission_order(team, enemy_templates):
+    worker = BattleWorker()
+    fights = [generate_enemy_team(s, enemy_templates, characters=False, rng=s) for s in (5, 40, 80)]
+    jobs = [worker.submit(team, enemies, rng=s, skills=s == 40) for s, enemies in zip((5, 40, 80), fights)]
+    worker.close(timeout=60)
+    assert worker.pending() == 0
+    events = worker.poll()
+    assert [job for kind, job, _ in events if kind == DONE] == jobs
+    for job, (s, enemies) in zip(jobs, zip((5, 40, 80), fights)):
+        expected = battle(team, enemies, rng=s, skills=s == 40)
+        rounds = [data for kind, j, data in events if kind == ROUND and j == job]
+        result = next(data for kind, j, data in events if kind == DONE and j == job)
+        # every round streamed as it was fought, with the lines the finished log renders
+        assert [turn for turn, _ in rounds] == list(range(1, expected["turns"] + 1))
+        assert [lines for _, lines in rounds] == expected["log"].rounds()
+        assert (result["player_win"], result["turns"]) == (expected["player_win"], expected["turns"])
+    assert worker.poll() == []
+
+def test_failed_battle_is_reported(team, capsys):
+    worker = BattleWorker()
+    bad = worker.submit(team, [{"name": "X", "stats": {"hp": "lots"}}])
+    good = worker.submit(team, [], log_level="none")
+    worker.close(timeout=10)
+    events = worker.poll()
+    assert [(kind, job) for kind, job, _ in events if kind != ROUND] == [(FAILED, bad), (DONE, good)]
+    assert isinstance(events[0][2], Exception)
+    assert "Traceback" in capsys.readouterr().err
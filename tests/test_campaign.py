@@ -0,0 +1,59 @@
+# tests/test_campaign.py
+import copy
+import pytest
+import campaign
+from campaign import (enemy_unit, generate_enemy_team, get_stage_rewards, get_stage_rewards_range,
+                      get_stage_rewards_ranges, make_enemy)
+
+ITEMS = ("Coins", "Gems", "Gear", "XP", "Essence")
+
+def summed(start, end):
+    total = dict.fromkeys(ITEMS, 0)
+    for stage in range(start, end + 1):
+        for item, n in get_stage_rewards(stage).items():
+            total[item] += n
+    return total
+
+@pytest.mark.parametrize("start,end", [(1, 1), (1, 10), (0, 7), (3, 3), (5, 4), (14, 83), (1, 1000), (997, 1013)])
+def test_range_matches_per_stage_loop(start, end):
+    assert get_stage_rewards_range(start, end) == summed(start, end)
+
+def test_every_small_range():
+    for start in range(0, 40):
+        for end in range(start - 1, 40):
+            assert get_stage_rewards_range(start, end) == summed(start, end)
+
+def test_ranges_match_per_stage_loop():
+    pytest.importorskip("numpy")
+    pairs = [(1, 1), (1, 10), (5, 4), (14, 83), (300, 1000), (2, 3)]
+    ranges = get_stage_rewards_ranges([s for s, _ in pairs], [e for _, e in pairs])
+    for i, (start, end) in enumerate(pairs):
+        assert {item: int(ranges[item][i]) for item in ITEMS} == summed(start, end)
+
+@pytest.mark.parametrize("stage", (1, 25, 300))
+def test_enemy_unit_matches_make_enemy(enemy_templates, stage):
+    for t in enemy_templates:
+        ch, unit = make_enemy(t, stage), enemy_unit(t, stage)
+        assert unit["stats"] == ch.current_stats
+        assert (unit["id"], unit["skills"]) == (ch.id, ch.skills)
+
+def test_both_team_kinds_draw_the_same_enemies(enemy_templates):
+    chars = generate_enemy_team(12, enemy_templates, rng=5)
+    units = generate_enemy_team(12, enemy_templates, characters=False, rng=5)
+    assert [c.current_stats for c in chars] == [u["stats"] for u in units]
+
+def test_enemy_cache(enemy_templates, monkeypatch):
+    monkeypatch.setattr(campaign, "_enemy_cache", campaign.OrderedDict())
+    monkeypatch.setattr(campaign, "ENEMY_CACHE_SIZE", 4)
+    t = enemy_templates[0]
+    first = enemy_unit(t, 3)
+    assert enemy_unit(t, 3) is first  # hit: the same shared unit
+    for stage in range(4, 8):
+        enemy_unit(t, stage)
+    assert len(campaign._enemy_cache) == 4 and (id(t), 3) not in campaign._enemy_cache
+    assert enemy_unit(t, 3) is not first and enemy_unit(t, 3) == first
+    # a different template dict never gets another one's entry, even at a reused id
+    other = copy.deepcopy(t)
+    other["stats"]["attack"] += 1
+    campaign._enemy_cache[(id(other), 3)] = campaign._enemy_cache[(id(t), 3)]
+    assert enemy_unit(other, 3)["stats"]["attack"] > first["stats"]["attack"]
@@ -0,0 +1,40 @@
+# tests/test_character.py
+import pytest
+from character import Character, compute_stats
+
+@pytest.fixture
+def hero(hero_templates):
+    t = hero_templates[0]
+    return Character(t["id"], t.get("rarity", "rare"), t.get("class", "Warrior"), t["stats"], t["skills"])
+
+def expected(ch):
+    return compute_stats(ch.id, ch.rarity, ch.level, ch.stars, ch.awakened, ch.base_stats)
+
+@pytest.mark.parametrize("field, value", (("level", 25), ("stars", 4), ("awakened", True)))
+def test_stats_follow_progress(hero, field, value):
+    before = hero.current_stats
+    setattr(hero, field, value)
+    assert hero.current_stats == expected(hero)
+    assert hero.current_stats["attack"] > before["attack"]
+
+def test_stats_cached_until_a_change(hero):
+    stats = hero.current_stats
+    hero.level = hero.level  # same value: nothing to recompute
+    assert hero.current_stats is stats
+    hero.level += 1
+    assert hero.current_stats is not stats
+
+def test_recalc_after_base_stats_edit(hero):
+    hero.current_stats
+    hero.base_stats["attack"] *= 2
+    hero.recalc()
+    assert hero.current_stats == expected(hero)
+
+def test_compute_stats_growth():
+    base = {"hp": 1000, "attack": 100, "crit_rate": 0.1}
+    stats = compute_stats("x", "epic", 11, 3, False, base)
+    scale = 1.3 * 1.25
+    assert stats["attack"] == pytest.approx(100 * 1.03**10 * scale)
+    assert stats["crit_rate"] == pytest.approx(0.1 * 1.1 * scale)
+    assert stats["max_hp"] == stats["hp"]
+    assert compute_stats("x", "epic", 11, 3, True, base)["attack"] == pytest.approx(stats["attack"] * 1.3)
@@ -0,0 +1,27 @@
+# tests/test_headless.py
+import json, os, subprocess, sys
+from conftest import ROOT
+
+# prints the modules of interest loaded once `code` has run
+CHECK = "\nimport sys; print(sorted(m for m in ('pygame', 'numpy', 'ui') if m in sys.modules))"
+
+def run(code, cwd):
+    out = subprocess.run([sys.executable, "-c", code + CHECK], cwd=cwd, capture_output=True, text=True,
+                         env=dict(os.environ, PYTHONPATH=ROOT), check=True)
+    return out.stdout.strip().splitlines()
+
+def test_game_logic_imports_no_pygame_or_numpy():
+    lines = run("import battle, battle_worker, campaign, character, idle, roster, save_load, skill_battle", ROOT)
+    assert lines == ["[]"]
+
+def test_headless_run(tmp_path):
+    os.symlink(os.path.join(ROOT, "data"), tmp_path / "data")
+    main = os.path.join(ROOT, "main.py")
+    code = f"import runpy; sys.argv = ['main.py', '--headless', '-n', '3']; runpy.run_path({main!r}, run_name='__main__')"
+    lines = run("import sys; " + code, tmp_path)
+    summary = json.loads(lines[0])
+    assert (summary["start_stage"], summary["stage"], summary["battles"]) == (1, 4, 3)
+    assert lines[1] == "[]"
+    assert (tmp_path / "roster_save.dat").exists() and (tmp_path / "save.snap").exists()
+    # the next run starts where this one saved
+    assert json.loads(run("import sys; " + code, tmp_path)[0])["start_stage"] == 4
@@ -0,0 +1,75 @@
+# tests/test_idle.py
+import pytest
+import idle
+from battle import battle, BattleUnit
+from campaign import get_stage_rewards
+from roster import Roster
+from seeding import derive_seed
+
+def no_crits(unit):
+    return dict(unit, stats=dict(unit["stats"], crit_rate=0.0))
+
+@pytest.fixture(scope="module")
+def team(hero_templates):
+    roster = Roster()
+    for t in hero_templates[:5]:
+        roster.add_from_template(t)
+    return roster.get_team(5)
+
+def summed_rewards(start, end):
+    total = {}
+    for s in range(start, end + 1):
+        for item, amount in get_stage_rewards(s).items():
+            total[item] = total.get(item, 0) + amount
+    return total
+
+@pytest.mark.parametrize("stage", (1, 30, 60, 90))
+def test_expected_battle_without_crits_is_battle(team, enemy_templates, stage):
+    from campaign import enemy_unit
+    allies = [no_crits({"name": c.name, "stats": c.current_stats}) for c in team]
+    enemies = [no_crits(enemy_unit(t, stage)) for t in enemy_templates[:5]]
+    expected = battle(allies, enemies, log_level="none")
+    win, turns, margin = idle.expected_battle([BattleUnit(u) for u in allies], [BattleUnit(u) for u in enemies])
+    assert (win, turns) == (expected["player_win"], expected["turns"])
+    assert 0 <= margin <= 1
+
+def test_plain_fast_forward(team, enemy_templates):
+    away = 12 * 3600
+    result = idle.fast_forward(team, enemy_templates, 1, away, rng=3, skills=False)
+    assert result == idle.fast_forward(team, enemy_templates, 1, away, rng=3, skills=False)
+    assert 0 < result["cleared"] <= result["attempts"] <= away // idle.SECONDS_PER_BATTLE
+    assert result["stage"] == 1 + result["cleared"]
+    # only stages near the win/loss boundary are fought
+    assert result["simulated"] < result["cleared"]
+    assert result["rewards"] == summed_rewards(1, result["stage"] - 1)
+
+def test_fast_forward_limits(team, enemy_templates):
+    none = idle.fast_forward(team, enemy_templates, 7, idle.SECONDS_PER_BATTLE - 1, rng=1, skills=False)
+    assert (none["stage"], none["cleared"], none["attempts"]) == (7, 0, 0)
+    capped = idle.fast_forward(team, enemy_templates, 1, 10 * idle.MAX_OFFLINE_SECONDS, rng=1, skills=False)
+    assert capped == idle.fast_forward(team, enemy_templates, 1, idle.MAX_OFFLINE_SECONDS, rng=1, skills=False)
+
+@pytest.mark.parametrize("last_clear", (4, 5, 37, 99, 100))
+def test_clear_frontier_search(team, enemy_templates, monkeypatch, last_clear):
+    sampled = []
+    def win_chance(team, templates, stage, *args, **kwargs):
+        sampled.append(stage)
+        return 1.0 if stage <= last_clear else 0.75
+    monkeypatch.setattr(idle, "win_chance", win_chance)
+    assert idle.clear_frontier(team, enemy_templates, 5, 100, seed=1) == last_clear
+    # gallop and bisect: a few stages sampled, not every one
+    assert len(sampled) <= 2 * 7 + 1
+
+def test_skill_fast_forward(team, enemy_templates):
+    away = 6 * 3600
+    result = idle.fast_forward(team, enemy_templates, 1, away, rng=8)
+    assert result == idle.fast_forward(team, enemy_templates, 1, away, rng=8)
+    assert 0 < result["cleared"] <= result["attempts"] <= away // idle.SECONDS_PER_BATTLE
+    assert result["rewards"] == summed_rewards(1, result["stage"] - 1)
+
+def test_clear_frontier_ends_between_a_clear_and_an_unclear_stage(team, enemy_templates):
+    frontier = idle.clear_frontier(team, enemy_templates, 1, 500, seed=3)
+    assert 1 <= frontier < 500
+    clear = lambda s: idle.win_chance(team, enemy_templates, s, samples=idle.DECISIVE_SAMPLES,
+                                      seed=derive_seed(3, s)) == 1
+    assert clear(frontier) and not clear(frontier + 1)
@@ -0,0 +1,59 @@
+# tests/test_instrument.py
+import json
+import pytest
+import instrument
+
+@pytest.fixture(autouse=True)
+def clean():
+    instrument.reset()
+    yield
+    instrument.enable(False)
+    instrument.reset()
+
+@instrument.timed("test.work")
+def work(x):
+    return x * 2
+
+def test_off_by_default_records_nothing():
+    assert not instrument.enabled
+    assert work(2) == 4
+    with instrument.timer("test.block"):
+        pass
+    instrument.count("test.calls")
+    assert instrument.stats() == {"timings": {}, "counters": {}}
+
+def test_timings_and_counters():
+    instrument.enable()
+    for i in range(10):
+        work(i)
+    with instrument.timer("test.block"):
+        pass
+    instrument.count("test.calls", 3)
+    instrument.counted("test.calls", work)(1)
+    stats = instrument.stats()
+    assert stats["timings"]["test.work"]["count"] == 11
+    assert stats["timings"]["test.block"]["count"] == 1
+    assert stats["counters"] == {"test.calls": 4}
+    # toggled off again (F3), nothing more is recorded
+    instrument.enable(False)
+    work(1)
+    assert instrument.stats()["timings"]["test.work"]["count"] == 11
+
+def test_histogram_percentiles():
+    hist = instrument.Histogram()
+    for us in [1] * 90 + [1000] * 10:
+        hist.add(us / 1e6)
+    summary = hist.summary()
+    assert summary["count"] == 100 and summary["max_us"] == pytest.approx(1000)
+    assert summary["p50_us"] <= 2 < 1000 <= summary["p95_us"] <= 1024
+
+def test_from_env_and_dump(tmp_path, monkeypatch):
+    monkeypatch.delenv("WUKONG_PROFILE", raising=False)
+    assert instrument.from_env() is None and not instrument.enabled
+    out = str(tmp_path / "profile.json")
+    monkeypatch.setenv("WUKONG_PROFILE", out)
+    assert instrument.from_env() == out and instrument.enabled
+    work(1)
+    instrument.dump_json(out)
+    with open(out) as f:
+        assert json.load(f)["timings"]["test.work"]["count"] == 1
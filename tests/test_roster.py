@@ -0,0 +1,78 @@
+# tests/test_roster.py
+import threading
+import pytest
+from character import Character
+from roster import Roster, RosterStore
+
+@pytest.fixture
+def roster(hero_templates):
+    roster = Roster()
+    for t in hero_templates:
+        roster.add_from_template(t)
+    return roster
+
+def as_character(t):
+    return Character(t["id"], t["rarity"], t["class"], t["stats"], t["skills"], display_name=t.get("name"))
+
+def test_views_match_characters(roster, hero_templates):
+    assert len(roster.heroes) == len(hero_templates)
+    for view, t in zip(roster.heroes, hero_templates):
+        ch = as_character(t)
+        assert view.to_dict() == ch.to_dict()
+        assert view.current_stats == ch.current_stats
+        # ints stay ints, floats stay floats
+        assert {k: type(v) for k, v in view.base_stats.items()} == {k: type(v) for k, v in t["stats"].items()}
+
+def test_extra_stats_kept():
+    store = RosterStore()
+    slot = store.add("x", "X", "rare", "Warrior", {"hp": 10, "lifesteal": 0.2}, [])
+    assert store.base_stats(slot) == {"hp": 10, "lifesteal": 0.2}
+
+def test_progress_recomputes_stats(roster):
+    hero = roster.heroes[0]
+    before = hero.current_stats
+    hero.level = 30
+    hero.awakened = True
+    ch = hero.to_character()
+    assert hero.current_stats == ch.current_stats != before
+    assert 0 in roster.heroes.dirty
+
+def test_base_stats_setter(roster):
+    hero = roster.heroes[1]
+    hero.current_stats
+    stats = hero.base_stats
+    stats["attack"] *= 2
+    stats["lifesteal"] = 0.1
+    hero.base_stats = stats
+    assert hero.base_stats == stats
+    assert hero.current_stats == hero.to_character().current_stats
+    assert 1 in roster.heroes.dirty
+
+def test_views_are_live_and_copies_detach(roster):
+    import copy
+    a, b = roster.heroes[2], roster.heroes[2]
+    assert a == b and hash(a) == hash(b)
+    detached = copy.deepcopy(a)
+    a.level = 50
+    assert b.level == 50 and detached.level == 1
+
+def test_lazy_records_read_once(tmp_path, roster):
+    path = str(tmp_path / "roster.dat")
+    roster.save_to_file(path)
+    loaded = Roster()
+    loaded.load_from_file(path)
+    records = loaded.heroes.records
+    reads = []
+    read = records.read
+    records.read = lambda slot: reads.append(slot) or read(slot)
+    # many threads racing for the same unread slots: each record is read exactly once,
+    # and no thread sees a slot before it is filled
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append([h.to_dict() for h in loaded.heroes]))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(reads) == list(range(len(roster.heroes)))
+    assert seen == [[h.to_dict() for h in roster.heroes]] * len(threads)
@@ -0,0 +1,117 @@
+# tests/test_roster_file.py
+import os, threading
+import pytest
+import roster_file
+from roster import Roster
+from roster_file import RecordFile
+
+def hero_state(roster):
+    return [(h.id, h.level, h.stars, h.awakened, h.current_stats) for h in roster.heroes]
+
+@pytest.fixture
+def saved(tmp_path, hero_templates):
+    """A roster of 3 copies of every template, saved to a RecordFile."""
+    path = str(tmp_path / "roster.dat")
+    roster = Roster()
+    for t in hero_templates * 3:
+        roster.add_from_template(t)
+    roster.save_to_file(path)
+    return roster, path
+
+def reload(path):
+    roster = Roster()
+    roster.load_from_file(path)
+    return roster
+
+def test_save_and_reload(saved):
+    roster, path = saved
+    assert RecordFile.is_record_file(path)
+    assert hero_state(reload(path)) == hero_state(roster)
+
+def test_incremental_save_only_appends_changed_heroes(saved):
+    _, path = saved
+    roster = reload(path)
+    size = os.path.getsize(path)
+    roster.heroes[1].level = 20
+    roster.heroes[4].stars = 3
+    roster.heroes[4].awakened = True
+    assert sorted(roster.heroes.dirty) == [1, 4]
+    roster.save_to_file(path)
+    assert not roster.heroes.dirty
+    # two records appended, nothing rewritten in place
+    grown = os.path.getsize(path) - size
+    assert 0 < grown < 2 * max(roster.heroes.records.index[2::3]) + 3
+    again = reload(path)
+    assert hero_state(again) == hero_state(roster)
+    assert (again.heroes[1].level, again.heroes[4].stars, again.heroes[4].awakened) == (20, 3, True)
+
+def test_new_heroes_are_saved(saved, hero_templates):
+    _, path = saved
+    roster = reload(path)
+    roster.add_from_template(hero_templates[0])
+    roster.save_to_file(path)
+    assert hero_state(reload(path)) == hero_state(roster)
+
+def test_torn_append_keeps_previous_save(saved):
+    roster, path = saved
+    with open(path, "ab") as f:
+        f.write(b'0 {"id":"torn')  # a save that crashed mid-record
+    assert hero_state(reload(path)) == hero_state(roster)
+    os.remove(path + ".idx")  # and the index is rebuilt without it
+    assert hero_state(reload(path)) == hero_state(roster)
+
+def test_interrupted_swap_is_finished_or_dropped(saved):
+    roster, path = saved
+    # crash before the data file was replaced: the .new pair is dropped
+    for suffix in (".new", ".idx.new"):
+        with open(path + suffix, "wb") as f:
+            f.write(b"junk")
+    assert hero_state(reload(path)) == hero_state(roster)
+    assert not os.path.exists(path + ".new") and not os.path.exists(path + ".idx.new")
+
+def test_compaction(saved, monkeypatch):
+    monkeypatch.setattr(roster_file, "COMPACT_MIN_BYTES", 1024)
+    _, path = saved
+    roster = reload(path)
+    for level in range(2, 30):
+        for hero in roster.heroes[::2]:
+            hero.level = level
+        roster.save_to_file(path)
+        records = roster.heroes.records
+        assert records.size == os.path.getsize(path)
+        assert records.size - records.live <= max(records.live, 1024)
+    assert hero_state(reload(path)) == hero_state(roster)
+
+def test_compaction_waits_for_a_read_in_progress(saved, monkeypatch):
+    original, path = saved
+    roster = reload(path)
+    for level in range(2, 2 + 2 * len(roster.heroes)):
+        roster.heroes[0].level = level
+        roster.save_to_file(path)
+    monkeypatch.setattr(roster_file, "COMPACT_MIN_BYTES", 0)
+    roster = reload(path)
+    roster.heroes[0].stars = 2
+    write = roster.heroes.save_job(path)
+    old = roster.heroes.records
+    entered, go = threading.Event(), threading.Event()
+    read = old.read
+    def slow_read(slot):
+        entered.set()
+        go.wait()
+        return read(slot)
+    old.read = slow_read
+    reader = threading.Thread(target=lambda: roster.heroes[5])
+    reader.start()
+    entered.wait()
+    saver = threading.Thread(target=write)
+    saver.start()
+    try:
+        saver.join(0.2)
+        # compacted, but the old file stays open until the read finishes
+        assert saver.is_alive() and old._f is not None
+    finally:
+        go.set()
+        reader.join()
+    saver.join()
+    assert old._f is None and roster.heroes.records is not old
+    assert roster.heroes[5].to_dict() == original.heroes[5].to_dict()
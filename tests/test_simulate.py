@@ -0,0 +1,45 @@
+# tests/test_simulate.py
+import pytest
+np = pytest.importorskip("numpy")
+
+from battle import battle
+from campaign import enemy_unit
+from roster import Roster
+from simulate import simulate_many
+
+def no_crits(unit):
+    return dict(unit, stats=dict(unit["stats"], crit_rate=0.0))
+
+@pytest.fixture(scope="module")
+def team(hero_templates):
+    roster = Roster()
+    for t in hero_templates[:5]:
+        roster.add_from_template(t)
+    return [no_crits({"name": c.name, "stats": c.current_stats}) for c in roster.get_team(5)]
+
+@pytest.mark.parametrize("stage", (1, 30, 60))
+def test_matches_battle_when_nothing_is_random(team, enemy_templates, stage):
+    # one crit-free template: every battle of the batch is the same fight
+    template = no_crits(enemy_templates[0])
+    expected = battle(team, [enemy_unit(template, stage)] * 5, log_level="none")
+    got = simulate_many(team, [template], stage, 50, rng=1)
+    assert got["win_rate"] == float(expected["player_win"])
+    assert got["turns"][expected["turns"]] == 50
+    assert got["timeouts"] == (50 if expected["title"] == "Timed out" else 0)
+
+def test_seeded_runs_repeat(team, enemy_templates):
+    a = simulate_many(team, enemy_templates, 30, 200, rng=5)
+    b = simulate_many(team, enemy_templates, 30, 200, rng=5)
+    assert a["win_rate"] == b["win_rate"] and a["mean_surviving_hp"] == b["mean_surviving_hp"]
+    assert (a["turns"] == b["turns"]).all()
+
+def test_stage_sequence(team, enemy_templates):
+    got = simulate_many(team, enemy_templates, range(10, 13), 100, max_turns=30, rng=2)
+    assert sorted(got) == [10, 11, 12]
+    for r in got.values():
+        assert r["turns"].sum() == 100 and len(r["turns"]) == 31
+        assert 0 <= r["win_rate"] <= 1
+
+def test_rejects_stats_past_float_precision(team, enemy_templates):
+    with pytest.raises(ValueError):
+        simulate_many(team, enemy_templates, 2000, 10)
@@ -0,0 +1,44 @@
+# tests/test_skill_battle.py
+from collections import Counter
+from battle import battle
+from battle_log import HIT, MISS, BUFF, _KIND_SHIFT
+
+def unit(name, speed, hp=10**9, attack=1, skills=()):
+    return {"name": name, "class": "Fighter", "skills": list(skills),
+            "stats": {"hp": hp, "attack": attack, "defense": 0, "speed": speed, "crit_rate": 0.0}}
+
+def actions(result):
+    """(turn, actor) of every attack in the log."""
+    return [(turn, actor) for turn, actor, _, _, flags in result["log"].iter_events()
+            if flags >> _KIND_SHIFT & 15 in (HIT, MISS)]
+
+def test_equal_speeds_act_once_every_round():
+    # every action lands exactly on a round boundary: it belongs to the round that ends there
+    allies = [unit(f"a{i}", 100) for i in range(3)]
+    enemies = [unit(f"e{i}", 100) for i in range(3)]
+    result = battle(allies, enemies, max_turns=10, rng=1, skills=True)
+    assert result["title"] == "Timed out"
+    per_round = Counter(turn for turn, _ in actions(result))
+    assert per_round == {turn: 6 for turn in range(1, 11)}
+    # allies first on ties, in list order
+    assert [actor for turn, actor in actions(result) if turn == 1] == [0, 1, 2, 3, 4, 5]
+
+def test_mixed_speeds_keep_every_action():
+    # round_time 10: the slow unit acts every 20, the fast one every 6.67 (partly on boundaries)
+    result = battle([unit("slow", 50)], [unit("fast", 150)], max_turns=60, rng=1, skills=True)
+    per_unit = Counter(actor for _, actor in actions(result))
+    assert per_unit == {0: 30, 1: 90}
+    fast_rounds = Counter(turn for turn, actor in actions(result) if actor == 1)
+    assert fast_rounds[1] == 1 and fast_rounds[2] == 2 and fast_rounds[60] == 2
+
+def test_buff_lasts_its_turns():
+    # a unit of average speed acts once per round: every third action (energy 30) it buffs
+    # itself for 2 turns, the round it casts and the next; its hits show when the buff is on
+    war_cry = {"name": "War Cry", "type": "active", "energy_cost": 30,
+               "effect": {"action": "buff", "target": "self", "stat": "attack", "amount": 1.0, "turns": 2}}
+    allies = [unit("a", 100, attack=100, skills=[war_cry])]
+    result = battle(allies, [unit("e", 100)], max_turns=8, rng=1, skills=True)
+    events = {turn: (flags >> _KIND_SHIFT & 15, value)
+              for turn, actor, _, value, flags in result["log"].iter_events() if actor == 0}
+    assert events == {1: (HIT, 100), 2: (HIT, 100), 3: (BUFF, 2), 4: (HIT, 200),
+                      5: (HIT, 100), 6: (BUFF, 2), 7: (HIT, 200), 8: (HIT, 100)}
@@ -0,0 +1,31 @@
+# tests/test_skills.py
+import copy
+import skills
+from skills import compile_skills
+
+def test_compiled_once_per_skills_object(hero_templates, monkeypatch):
+    monkeypatch.setattr(skills, "_COMPILED", skills.OrderedDict())
+    shared = tuple(hero_templates[0]["skills"])
+    assert compile_skills(shared) is compile_skills(shared)
+    # an equal but separate list is compiled on its own
+    assert compile_skills(copy.deepcopy(list(shared))) is not compile_skills(shared)
+
+def test_cache_is_bounded(hero_templates, monkeypatch):
+    monkeypatch.setattr(skills, "_COMPILED", skills.OrderedDict())
+    monkeypatch.setattr(skills, "COMPILED_CACHE_SIZE", 3)
+    lists = [tuple(t["skills"]) for t in hero_templates[:5]]
+    compiled = [compile_skills(s) for s in lists]
+    assert len(skills._COMPILED) == 3
+    assert compile_skills(lists[-1]) is compiled[-1]
+    assert compile_skills(lists[0]) is not compiled[0]
+
+def test_actives_by_priority():
+    skill_list = (
+        {"name": "Mend", "type": "active", "effect": {"action": "heal", "mult": 1.0}},
+        {"name": "Smash", "type": "active", "effect": {"action": "damage", "mult": 1.5}},
+        {"name": "Slash", "type": "active", "effect": {"action": "damage", "mult": 2.0}, "energy_cost": 40},
+        {"name": "Dance", "type": "active", "effect": {"action": "unknown"}},
+        {"name": "Spring", "type": "passive", "effect": {"action": "regen", "amount": 0.05}},
+    )
+    compiled = compile_skills(skill_list)
+    assert [(c.name, c.cost) for c in compiled.actives] == [("Slash", 40), ("Smash", 0), ("Mend", 0)]
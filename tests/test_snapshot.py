@@ -0,0 +1,62 @@
+# tests/test_snapshot.py
+import json, struct
+import pytest
+import snapshot
+
+DOCS = (
+    {},
+    [],
+    [[[]], {}],
+    {"a": [1, 2.5, "x", None, True, False, {"b": [], "c": {}}], "z": "y"},
+    {"big": 2**70, "neg": -2**63, "unicode": "悟空 ✓", "empty": ""},
+    42,
+    "only a string",
+)
+
+@pytest.mark.parametrize("doc", DOCS)
+def test_round_trip(doc):
+    assert snapshot.loads(snapshot.dumps(doc)) == doc
+
+def test_file_round_trip(tmp_path, hero_templates):
+    doc = {"heroes": hero_templates, "stage": 12, "gold": 1234.5}
+    path = str(tmp_path / "save.snap")
+    snapshot.save(doc, path)
+    assert snapshot.is_snapshot(path)
+    with snapshot.load(path) as snap:
+        assert snap.value() == doc
+        assert snap.get("heroes", 1, "stats") == hero_templates[1]["stats"]
+        assert snap.get("stage") == 12
+
+def test_every_subtree_decodes(hero_templates):
+    doc = {"heroes": hero_templates, "history": [{"stage": i, "rounds": [[f"r{i}"]]} for i in range(5)]}
+    with snapshot.Snapshot(snapshot.dumps(doc)) as snap:
+        def check(node, value):
+            assert snap.value(node) == value
+            if isinstance(value, (list, dict)):
+                for key, child in snap.children(node):
+                    check(child, value[key])
+        check(0, doc)
+
+def test_json_conversion(tmp_path, hero_templates):
+    src, snap_file, out = tmp_path / "a.json", str(tmp_path / "a.snap"), tmp_path / "b.json"
+    src.write_text(json.dumps(hero_templates))
+    snapshot.json_to_snapshot(src, snap_file)
+    snapshot.snapshot_to_json(snap_file, out)
+    assert json.loads(out.read_text()) == hero_templates
+
+def test_big_endian_machine(monkeypatch, hero_templates):
+    # _SWAP on a little-endian machine runs the big-endian path: columns swapped on save and load
+    doc = {"heroes": hero_templates, "n": -5, "x": 0.25}
+    data = snapshot.dumps(doc)
+    monkeypatch.setattr(snapshot, "_SWAP", True)
+    swapped = snapshot.dumps(doc)
+    assert swapped != data
+    assert snapshot.loads(swapped) == doc
+    monkeypatch.setattr(snapshot, "_SWAP", False)
+    assert snapshot.loads(data) == doc
+
+def test_rejects_unknown_byte_order():
+    data = bytearray(snapshot.dumps([1, 2]))
+    struct.pack_into("<I", data, snapshot.HEADER.size - 4, 1)
+    with pytest.raises(ValueError):
+        snapshot.loads(bytes(data))
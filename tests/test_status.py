@@ -0,0 +1,58 @@
+# tests/test_status.py
+import pytest
+from status import StatusBoard, WHEEL_SIZE
+
+class Unit:
+    def __init__(self, attack=100, defense=50):
+        self.attack = attack
+        self.defense = defense
+        self.buffs = None
+
+def run_turns(board, first, last):
+    """{turn: keys expired at the end of it}"""
+    return {t: [s.key for s in board.expire(t)] for t in range(first, last + 1)}
+
+def test_expires_at_the_end_of_its_last_turn():
+    board, u = StatusBoard(), Unit()
+    board.apply(u, "rage", "attack", 0.5, True, last_turn=3)
+    board.apply(u, "guard", "defense", 20, False, last_turn=1)
+    assert (u.attack, u.defense) == (150, 70)
+    assert board.expire(1)[0].key == "guard" and u.defense == 50
+    assert board.expire(2) == [] and u.attack == 150
+    assert [s.key for s in board.expire(3)] == ["rage"] and u.attack == 100
+    assert u.buffs.active == {} and u.buffs.base == {}
+
+def test_stacking_and_exact_restore():
+    board, u = StatusBoard(), Unit(attack=333)
+    board.apply(u, "a", "attack", 0.1, True, 2)
+    board.apply(u, "b", "attack", -0.3, True, 4)
+    board.apply(u, "c", "attack", 7, False, 3)
+    assert u.attack == pytest.approx((333 + 7) * 1.1 * 0.7)
+    board.expire(2)
+    assert u.attack == pytest.approx((333 + 7) * 0.7)
+    board.expire(3)
+    board.expire(4)
+    assert u.attack == 333 and isinstance(u.attack, int)
+
+def test_zero_factor():
+    board, u = StatusBoard(), Unit()
+    board.apply(u, "freeze", "attack", -1.0, True, 2)
+    board.apply(u, "boost", "attack", 0.5, True, 3)
+    assert u.attack == 0
+    board.expire(2)
+    assert u.attack == pytest.approx(150)
+
+def test_reapply_extends_instead_of_stacking():
+    board, u = StatusBoard(), Unit()
+    assert board.apply(u, "rage", "attack", 1.0, True, 2)
+    assert not board.apply(u, "rage", "attack", 1.0, True, 5)
+    assert u.attack == 200
+    assert run_turns(board, 1, 6) == {1: [], 2: [], 3: [], 4: [], 5: ["rage"], 6: []}
+    assert u.attack == 100
+
+def test_longer_than_the_wheel():
+    board, u = StatusBoard(), Unit()
+    last = 1 + 2 * WHEEL_SIZE + 3
+    board.apply(u, "long", "attack", 10, False, last)
+    expired = run_turns(board, 1, last + WHEEL_SIZE)
+    assert [t for t, keys in expired.items() if keys] == [last]
@@ -0,0 +1,51 @@
+# tests/test_team_optimizer.py
+from time import perf_counter
+import pytest
+import team_optimizer
+from battle import BattleUnit
+from campaign import enemy_unit
+from roster import Roster
+from team_optimizer import best_teams, hero_pool, win_rate
+
+@pytest.fixture(scope="module")
+def heroes(hero_templates):
+    roster = Roster()
+    for level in (1, 20, 40):
+        for t in hero_templates:
+            slot = roster.heroes.add(t["id"], t["name"], t["rarity"], t["class"], t["stats"], t["skills"], level)
+            # a second copy of every hero: same fight, kept once in the pool
+            roster.heroes.add(t["id"], t["name"], t["rarity"], t["class"], t["stats"], t["skills"], level)
+    return list(roster.heroes)
+
+def test_pool_merges_copies(heroes, enemy_templates):
+    enemies = [BattleUnit(enemy_unit(t, 40)) for t in enemy_templates]
+    pool = hero_pool(heroes, enemies, per_measure=4)
+    keys = [(s.hero.id, s.hero.level) for s in pool]
+    assert len(keys) == len(set(keys)) <= 12
+
+def test_ranked_teams(heroes, enemy_templates):
+    ranked = best_teams(heroes, enemy_templates, 40, top=3, budget=30, samples=20, seed=1)
+    assert len(ranked) == 3
+    for c in ranked:
+        assert len({(h.id, h.level) for h in c["team"]}) == 5
+        assert c["battles"] == 20 and 0 <= c["win_rate"] <= 1
+        # sturdiest in front
+        ehp = [team_optimizer.HeroScore(h, [BattleUnit(enemy_unit(t, 40)) for t in enemy_templates]).ehp
+               for h in c["team"]]
+        assert ehp == sorted(ehp, reverse=True)
+    assert [c["win_rate"] for c in ranked] == sorted((c["win_rate"] for c in ranked), reverse=True)
+
+def test_budget_is_kept_inside_a_team(heroes, enemy_templates):
+    started = perf_counter()
+    ranked = best_teams(heroes, enemy_templates, 40, top=3, budget=0.3, samples=10**6)
+    assert perf_counter() - started < 2.0
+    assert 0 < ranked[0]["battles"] < 10**6
+    assert all(c["win_rate"] is None for c in ranked if not c["battles"])
+    assert all(c["win_rate"] is None for c in best_teams(heroes, enemy_templates, 40, top=3, budget=0))
+
+@pytest.mark.parametrize("skills", (False, True))
+def test_win_rate_is_seeded(heroes, enemy_templates, skills):
+    team = heroes[-5:]
+    rate, fought = win_rate(team, enemy_templates, 40, 60, 3, skills=skills)
+    assert fought == 60 and (rate, fought) == win_rate(team, enemy_templates, 40, 60, 3, skills=skills)
+    assert win_rate(team, enemy_templates, 40, 60, 3, skills=skills, deadline=0)[1] == (0 if skills else 60)
@@ -1,8 +1,204 @@
 # ui.py
-import pygame
+"""
+Drawing helpers for the pygame UI. pygame is imported by the functions that use it, not
+here, so headless code (workers, tools, main.py --headless) never loads SDL.
+"""
+from collections import OrderedDict
+from battle_log import entry_rounds
+
+TEXT_CACHE_SIZE = 2048
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, color, font)."""
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (text, color, font)
+        surf = self._surfaces.get(key)
+        if surf is None:
+            surf = self._surfaces[key] = font.render(text, True, color)
+            if len(self._surfaces) > self.maxsize:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surf
+
+text_cache = TextCache()
+
+class Canvas:
+    """
+    Records a frame's draw calls instead of drawing them. present() diffs them against the
+    previous frame, redraws only where something changed and passes just those rectangles to
+    pygame.display.update. Surfaces blitted through blit() are compared by identity, so
+    call invalidate() after drawing into one in place.
+    """
+    def __init__(self, surface):
+        self.surface = surface
+        self._ops = []   # (op, rect) drawn this frame
+        self._prev = []
+
+    def get_rect(self):
+        return self.surface.get_rect()
+
+    def fill(self, color):
+        self._ops.append((("fill", tuple(color)), tuple(self.surface.get_rect())))
+
+    def draw_rect(self, color, rect, width=0):
+        import pygame
+        r = tuple(pygame.Rect(rect))
+        self._ops.append((("rect", tuple(color), r, width), r))
+
+    def draw_text(self, font, text, x, y, color):
+        surf = text_cache.render(font, text, color)
+        self._ops.append((("text", font, text, color, x, y), (x, y, *surf.get_size())))
+
+    def blit(self, surface, pos):
+        self._ops.append((("blit", surface, tuple(pos)), (*pos, *surface.get_size())))
+
+    def invalidate(self):
+        self._prev = []
+
+    def present(self):
+        """Draws the changed parts of the frame and updates them on screen. Returns the dirty rects."""
+        import pygame
+        ops, prev = self._ops, self._prev
+        self._ops, self._prev = [], ops
+        if ops == prev:
+            return []
+        now, before = set(ops), set(prev)
+        if now == before:
+            dirty = [self.surface.get_rect()]  # same draws, different order
+        else:
+            dirty = [pygame.Rect(r) for _, r in now ^ before]
+        area = dirty[0].unionall(dirty[1:]).clip(self.surface.get_rect())
+        self.surface.set_clip(area)
+        for op, _ in ops:
+            self._draw(op)
+        self.surface.set_clip(None)
+        pygame.display.update(dirty)
+        return dirty
+
+    def _draw(self, op):
+        kind = op[0]
+        if kind == "fill":
+            self.surface.fill(op[1])
+        elif kind == "rect":
+            import pygame
+            pygame.draw.rect(self.surface, op[1], op[2], op[3])
+        elif kind == "text":
+            _, font, text, color, x, y = op
+            self.surface.blit(text_cache.render(font, text, color), (x, y))
+        else:
+            self.surface.blit(op[1], op[2])
 
 def draw_text(screen, font, text, x, y, color=(240,240,240)):
-    screen.blit(font.render(text, True, color), (x,y))
+    if isinstance(screen, Canvas):
+        screen.draw_text(font, text, x, y, color)
+    else:
+        screen.blit(text_cache.render(font, text, color), (x,y))
+
+def draw_rect(screen, color, rect, width=0):
+    if isinstance(screen, Canvas):
+        screen.draw_rect(color, rect, width)
+    else:
+        import pygame
+        pygame.draw.rect(screen, color, rect, width)
+
+class VirtualList:
+    """
+    Scrolling list with a fixed row height: only the rows inside the viewport are drawn,
+    and hit-testing maps a mouse position straight to a row index.
+    """
+    def __init__(self, x, y, width, height, row_height):
+        import pygame
+        self.rect = pygame.Rect(x, y, width, height)
+        self.row_height = row_height
+        self.count = 0
+        self.top = 0         # first visible row
+        self.source = None   # what rows were built from (see draw_battle_details)
+        self.source_size = 0
+        self.rows = []
+
+    @property
+    def page_size(self):
+        return max(1, self.rect.height // self.row_height)
+
+    def set_count(self, count):
+        self.count = count
+        self.scroll(0)
+
+    def visible(self):
+        return range(self.top, min(self.count, self.top + self.page_size))
+
+    def row_y(self, i):
+        return self.rect.y + (i - self.top) * self.row_height
+
+    def hit_test(self, pos):
+        """Row index under pos, or None."""
+        if not self.rect.collidepoint(pos):
+            return None
+        i = self.top + (pos[1] - self.rect.y) // self.row_height
+        return i if i < self.count else None
+
+    def scroll(self, rows):
+        self.top = max(0, min(self.top + rows, self.count - self.page_size))
+
+    def ensure_visible(self, i):
+        if i < self.top:
+            self.top = i
+        elif i >= self.top + self.page_size:
+            self.top = i - self.page_size + 1
+        self.scroll(0)
+
+    def key_step(self, key):
+        """Rows an arrow/page/home/end key moves by (0 for other keys)."""
+        import pygame
+        return {pygame.K_UP: -1, pygame.K_DOWN: 1,
+                pygame.K_PAGEUP: -self.page_size, pygame.K_PAGEDOWN: self.page_size,
+                pygame.K_HOME: -self.count, pygame.K_END: self.count}.get(key, 0)
+
+    def move(self, selected, key):
+        """New selection after an arrow/page/home/end key, scrolled into view."""
+        selected = max(0, min(self.count - 1, selected + self.key_step(key)))
+        self.ensure_visible(selected)
+        return selected
+
+    def page(self, key):
+        """Scrolls without a selection (arrow keys by one row, page keys by a page)."""
+        self.scroll(self.key_step(key))
+
+def roster_list():
+    return VirtualList(40, 80, 700, 392, 28)
+
+def details_list():
+    return VirtualList(40, 80, 720, 400, 20)
+
+def draw_back_button(screen, button_font):
+    import pygame
+    button_rect = pygame.Rect(650, 500, 120, 50)
+    draw_rect(screen, (100, 100, 100), button_rect)
+    draw_rect(screen, (255, 255, 255), button_rect, 2)
+    draw_text(screen, button_font, "Back", button_rect.x + 30, button_rect.y + 15, (255, 255, 255))
+    return button_rect
+
+def draw_reward_preview(screen, font, stage, rewards):
+    import pygame
+    screen.fill((30, 30, 60))
+    draw_text(screen, font, f"Stage {stage} Rewards", 50, 50, (255, 255, 0))
+    y = 120
+    for item, amount in rewards.items():
+        draw_text(screen, font, f"{item}: {amount}", 50, y, (255, 255, 255))
+        y += 30
+
+    fight_btn = pygame.Rect(200, 400, 150, 50)
+    back_btn = pygame.Rect(400, 400, 150, 50)
+    draw_rect(screen, (0, 200, 0), fight_btn)
+    draw_rect(screen, (200, 0, 0), back_btn)
+    draw_text(screen, font, "Fight", fight_btn.x+40, fight_btn.y+15, (0, 0, 0))
+    draw_text(screen, font, "Back", back_btn.x+40, back_btn.y+15, (0, 0, 0))
+    return fight_btn, back_btn
 
 def draw_menu(screen, font, options, selected):
     screen.fill((12,16,40))
@@ -10,20 +206,26 @@ def draw_menu(screen, font, options, selected):
     y = 80
     for i,opt in enumerate(options):
         bg = (40,40,80) if i!=selected else (80,120,80)
-        pygame.draw.rect(screen, bg, (40, y, 720, 36))
+        draw_rect(screen, bg, (40, y, 720, 36))
         draw_text(screen, font, opt, 60, y+8, (255,255,255))
         y += 46
     draw_text(screen, font, "Use UP/DOWN and ENTER. ESC to go back.", 40, 540, (180,180,180))
 
-def draw_roster(screen, font, roster, selected=0):
+def draw_roster(screen, font, roster, selected=0, view=None):
     screen.fill((10,30,20))
     draw_text(screen, font, "Roster", 40, 20, (230,230,230))
-    base_x, base_y = 40, 80
-    for i, h in enumerate(roster.heroes):
-        y = base_y + i*28
+    if view is None:
+        view = roster_list()
+    view.set_count(len(roster.heroes))
+    base_x = view.rect.x
+    for i in view.visible():
+        h = roster.heroes[i]
+        y = view.row_y(i)
         if i == selected:
-            pygame.draw.rect(screen, (40,80,40), (base_x-6, y-2, 700, 26))
+            draw_rect(screen, (40,80,40), (base_x-6, y-2, 700, 26))
         draw_text(screen, font, f"{i+1}. {h.name} ({h.rarity}) L{h.level} ★{h.stars} - {h.cls}", base_x, y)
+    if view.count > view.page_size:
+        draw_text(screen, font, f"{view.top+1}-{view.visible().stop} of {view.count}  (PgUp/PgDn)", base_x, 480, (160,160,160))
 
 def draw_battle_history(screen, font, history, selected=0):
     screen.fill((20,10,20))
@@ -33,27 +235,55 @@ def draw_battle_history(screen, font, history, selected=0):
         idx = len(history)-1 - i
         y = base_y + i*28
         if idx == selected:
-            pygame.draw.rect(screen, (50,40,80), (base_x-6, y-2, 720, 26))
+            draw_rect(screen, (50,40,80), (base_x-6, y-2, 720, 26))
         title = e.get("title", f"Battle {idx+1}")
         outcome = "Win" if e.get("player_win") else ("Loss" if e.get("player_win") is False else "Unknown")
+        if e.get("pending"):
+            outcome = "Fighting..."
         draw_text(screen, font, f"{idx+1}. {title} - {outcome}", base_x, y)
 
-def draw_battle_details(screen, font, entry):
+def battle_detail_rows(entry):
+    """(x, text, color) per line of a battle entry: round headers and their hits."""
+    rows = []
+    for r_idx, r in enumerate(entry_rounds(entry)):
+        rows.append((40, f"Round {r_idx+1}:", (240,240,240)))
+        rows.extend((60, line, (220,220,220)) for line in r)
+    return rows
+
+def draw_battle_details(screen, font, entry, view=None):
     screen.fill((12,12,12))
     title = entry.get("title", "Battle Details")
     draw_text(screen, font, title, 40, 20, (240,240,200))
-    y = 80
-    rounds = entry.get("rounds", [])
-    if not rounds:
-        draw_text(screen, font, "No details available.", 40, y)
+    if view is None:
+        view = details_list()
+    rounds = entry_rounds(entry)
+    if view.source is not entry or view.source_size != len(rounds):
+        # flattened once per entry (and per streamed round), then only the visible window is drawn
+        if view.source is not entry:
+            view.top = 0
+        view.source, view.source_size, view.rows = entry, len(rounds), battle_detail_rows(entry)
+        view.set_count(len(view.rows))
+    if not view.rows:
+        draw_text(screen, font, "No details available.", 40, 80)
         return
-    for r_idx, r in enumerate(rounds):
-        draw_text(screen, font, f"Round {r_idx+1}:", 40, y)
-        y += 24
-        for line in r:
-            draw_text(screen, font, line, 60, y, (220,220,220))
-            y += 18
-        y += 6
+    for i in view.visible():
+        x, line, color = view.rows[i]
+        draw_text(screen, font, line, x, view.row_y(i), color)
+    if view.count > view.page_size:
+        draw_text(screen, font, f"Lines {view.top+1}-{view.visible().stop} of {view.count} (UP/DOWN, PgUp/PgDn)", 40, 540, (160,160,160))
+
+def draw_stats_overlay(screen, font, stats, x=430, y=10, rows=14):
+    """Debug overlay of instrument.stats(): the slowest timings by total time, then counters."""
+    timings = sorted(stats["timings"].items(), key=lambda kv: -kv[1]["total_ms"])[:rows]
+    counters = list(stats["counters"].items())[:max(0, rows - len(timings))]
+    draw_rect(screen, (0,0,0), (x-6, y-4, 800-x, 16*(len(timings)+len(counters)+1)+8))
+    draw_text(screen, font, "timing          mean us   p95 us   count", x, y, (255,255,0))
+    for name, t in timings:
+        y += 16
+        draw_text(screen, font, f"{name[:22]:<22} {t['mean_us']:>8.0f} {t['p95_us']:>8.0f} {t['count']:>7}", x, y, (200,255,200))
+    for name, n in counters:
+        y += 16
+        draw_text(screen, font, f"{name[:22]:<22} {n:>25}", x, y, (200,200,255))
 
 def draw_inventory(screen, font, inventory=None):
     screen.fill((0, 50, 0))